@@ -0,0 +1,215 @@
+import numpy as np
+from .constants import *
+from .grid import ChunkedBitGrid, pack_cells
+
+
+class AsteroidField:
+    """Set of asteroid cells packed into a chunked bitmap.
+
+    Membership is O(1), range queries only touch the chunks they overlap,
+    and memory is one bit per cell of the chunks that hold asteroids
+    instead of a dict per asteroid.
+    """
+    def __init__(self):
+        self.grid = ChunkedBitGrid()
+        self.count = 0
+
+    def clear(self):
+        self.grid.clear()
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, pos):
+        return bool(self.grid.get(pos[0], pos[1]))
+
+    def __iter__(self):
+        xs, ys = self.positions()
+        return zip(xs.tolist(), ys.tolist())
+
+    def add(self, x, y):
+        """Add an asteroid at (x, y); returns False if one was already there"""
+        if self.grid.get(x, y):
+            return False
+        self.grid.set(x, y, True)
+        self.count += 1
+        return True
+
+    def remove(self, x, y):
+        if not self.grid.get(x, y):
+            return False
+        self.grid.set(x, y, False)
+        self.count -= 1
+        return True
+
+    def clear_rect(self, x0, y0, x1, y1):
+        """Remove every asteroid with x0 <= x < x1 and y0 <= y < y1"""
+        xs, ys = self.query(x0, y0, x1, y1)
+        self.grid.set_many(xs, ys, False)
+        self.grid.drop_chunks(x0, y0, x1, y1)
+        self.count -= len(xs)
+
+    def add_many(self, xs, ys, limit=None):
+        """Add a batch of cells and return a mask of the ones that were new.
+
+        Repeated cells within the batch only count once (the first time).
+        If limit is given, only the first `limit` new cells are added.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        added = np.zeros(xs.shape, dtype=bool)
+        if xs.size == 0:
+            return added
+        _, first = np.unique(pack_cells(xs, ys), return_index=True)
+        added[first] = True
+        added &= ~self.grid.get_many(xs, ys)
+        if limit is not None:
+            added[np.flatnonzero(added)[limit:]] = False
+        self.grid.set_many(xs[added], ys[added], True)
+        self.count += int(added.sum())
+        return added
+
+    def contains_many(self, xs, ys):
+        return self.grid.get_many(xs, ys)
+
+    def query(self, x0, y0, x1, y1):
+        """Return (xs, ys) arrays of the asteroids with x0 <= x < x1 and y0 <= y < y1"""
+        window = self.grid.window(x0, y0, x1 - x0, y1 - y0)
+        xs, ys = np.nonzero(window)
+        return xs + x0, ys + y0
+
+    def count_in_rect(self, x0, y0, x1, y1):
+        return int(self.grid.window(x0, y0, x1 - x0, y1 - y0).sum())
+
+    def positions(self):
+        """Return (xs, ys) arrays of every asteroid"""
+        xs, ys = [], []
+        cs = self.grid.chunk_size
+        for (cx, cy) in self.grid.chunks:
+            lx, ly = np.nonzero(self.grid.unpack((cx, cy)))
+            xs.append(lx + cx * cs)
+            ys.append(ly + cy * cs)
+        if not xs:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(xs), np.concatenate(ys)
+
+    @property
+    def nbytes(self):
+        return self.grid.nbytes
+
+
+# Patch shapes: name -> function(rng, count, radius) returning a list of
+# (dx, dy, limit) candidate batches. Candidates are tried in order and up to
+# `limit` free cells are kept from each batch, so shapes oversample to make
+# up for cells that collide with existing asteroids.
+PATCH_SHAPES = {}
+OVERSAMPLE = 4
+PATCH_OVERHANG = 3  # Cells a shape may reach past its radius (spiral jitter, line spread, rounding)
+
+
+def register_patch_shape(name):
+    """Decorator that makes a candidate function available as a patch shape"""
+    def decorator(func):
+        PATCH_SHAPES[name] = func
+        return func
+    return decorator
+
+
+@register_patch_shape('cluster')
+def cluster_patch(rng, count, radius):
+    # Dense square cluster
+    n = count * OVERSAMPLE
+    half = radius // 2
+    return [(rng.integers(-half, half + 1, n), rng.integers(-half, half + 1, n), count)]
+
+
+@register_patch_shape('line')
+def line_patch(rng, count, radius):
+    # Linear asteroid belt in a random direction
+    angle = rng.uniform(0, 2 * np.pi)
+    n = count * OVERSAMPLE
+    along = rng.uniform(-radius, radius, n)
+    across = rng.uniform(-3, 3, n)  # Small perpendicular spread
+    dx = along * np.cos(angle) - across * np.sin(angle)
+    dy = along * np.sin(angle) + across * np.cos(angle)
+    return [(dx, dy, count)]
+
+
+@register_patch_shape('ring')
+def ring_patch(rng, count, radius):
+    n = count * OVERSAMPLE
+    angle = rng.uniform(0, 2 * np.pi, n)
+    distance = rng.uniform(radius // 3, radius, n)
+    return [(distance * np.cos(angle), distance * np.sin(angle), count)]
+
+
+@register_patch_shape('scattered')
+def scattered_patch(rng, count, radius):
+    # Wide scattered field
+    n = count * OVERSAMPLE
+    return [(rng.integers(-radius, radius + 1, n), rng.integers(-radius, radius + 1, n), count)]
+
+
+@register_patch_shape('dense_core')
+def dense_core_patch(rng, count, radius):
+    # Dense center with sparse outer ring
+    core = count // 2
+    core_n = core * OVERSAMPLE
+    third = radius // 3
+    core_dx = rng.integers(-third, third + 1, core_n)
+    core_dy = rng.integers(-third, third + 1, core_n)
+    outer_n = (count - core) * OVERSAMPLE * 2
+    outer_dx = rng.integers(-radius, radius + 1, outer_n)
+    outer_dy = rng.integers(-radius, radius + 1, outer_n)
+    keep = (np.abs(outer_dx) >= radius // 2) | (np.abs(outer_dy) >= radius // 2)
+    return [(core_dx, core_dy, core), (outer_dx[keep], outer_dy[keep], count - core)]
+
+
+@register_patch_shape('spiral')
+def spiral_patch(rng, count, radius):
+    # Two full turns outward with a little jitter
+    t = np.arange(count) / count
+    angle = t * 4 * np.pi
+    distance = t * radius
+    dx = distance * np.cos(angle) + rng.integers(-2, 3, count)
+    dy = distance * np.sin(angle) + rng.integers(-2, 3, count)
+    return [(dx, dy, count)]
+
+
+def generate_patch(field, rng, center, shape, count, radius, size=GALAXY_SIZE):
+    """Add one patch of the given shape to field; returns how many asteroids were placed"""
+    cx, cy = center
+    placed = 0
+    for dx, dy, limit in PATCH_SHAPES[shape](rng, count, radius):
+        xs = cx + np.rint(dx).astype(np.int64)
+        ys = cy + np.rint(dy).astype(np.int64)
+        inside = (xs >= 0) & (xs < size) & (ys >= 0) & (ys < size)
+        placed += int(field.add_many(xs[inside], ys[inside], limit=limit).sum())
+    return placed
+
+
+def pick_patch_centers(rng, num_patches, obstacles, bounds, attempts=50):
+    """Sample patch centers at least ASTEROID_PLANET_CLEARANCE away from obstacles.
+
+    Centers fall within bounds (x0, y0, x1, y1). Every patch gets `attempts`
+    candidate centers drawn in one batch; a patch whose candidates all land
+    too close to an obstacle is skipped.
+    """
+    x0, y0, x1, y1 = bounds
+    if num_patches <= 0 or x1 <= x0 or y1 <= y0:
+        return []
+    candidates = rng.integers((x0, y0), (x1, y1), (num_patches, attempts, 2))
+    flat = candidates.reshape(-1, 2)
+    valid = np.ones(len(flat), dtype=bool)
+    if len(obstacles):
+        obstacles = np.asarray(obstacles, dtype=np.int64)
+        # Work in slices so huge galaxies never build the full distance matrix
+        step = max(1, 4_000_000 // len(obstacles))
+        for start in range(0, len(flat), step):
+            diff = flat[start:start + step, None, :] - obstacles[None, :, :]
+            valid[start:start + step] = ((diff ** 2).sum(axis=2) >= ASTEROID_PLANET_CLEARANCE ** 2).all(axis=1)
+    valid = valid.reshape(num_patches, attempts)
+    has_center = valid.any(axis=1)
+    first = valid.argmax(axis=1)
+    return [tuple(candidates[i, first[i]].tolist()) for i in np.flatnonzero(has_center)]
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+import pygame
+from .constants import *
+
+
+class GridBackground:
+    """Galaxy grid lines pre-rendered into tiles and blitted a few at a time.
+
+    A tile covers a whole number of cells, so the same surface repeats
+    across the map at a given zoom. When cells shrink below
+    GRID_MIN_CELL_PX the per-cell outlines would merge into a grey block,
+    so a coarse grid with one line every few cells is drawn instead.
+    """
+    def __init__(self, color=GRID_COLOR, tile_px=GRID_TILE_PX, max_tiles=GRID_TILE_CACHE):
+        self.color = color
+        self.tile_px = tile_px
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()  # (cell_px, step) -> Surface, least recently used first
+
+    def step_for(self, cell_px):
+        """Cells between grid lines at this cell size (1 means every cell)"""
+        if cell_px >= GRID_MIN_CELL_PX:
+            return 1
+        for step in COARSE_GRID_STEPS:
+            if step * cell_px >= COARSE_GRID_MIN_PX:
+                return step
+        return COARSE_GRID_STEPS[-1]
+
+    def tile(self, cell_px, step):
+        key = (cell_px, step)
+        surface = self.tiles.get(key)
+        if surface is not None:
+            self.tiles.move_to_end(key)
+            return surface
+        period = cell_px * step
+        side = max(1, self.tile_px // period) * period
+        surface = pygame.Surface((side, side))
+        surface.fill(BLACK)
+        for p in range(0, side, period):
+            if step == 1:
+                # Same as outlining every cell: each cell gets its own left/top and right/bottom edge
+                for edge in (p, p + cell_px - 1):
+                    pygame.draw.line(surface, self.color, (edge, 0), (edge, side - 1))
+                    pygame.draw.line(surface, self.color, (0, edge), (side - 1, edge))
+            else:
+                pygame.draw.line(surface, self.color, (p, 0), (p, side - 1))
+                pygame.draw.line(surface, self.color, (0, p), (side - 1, p))
+        self.tiles[key] = surface
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return surface
+
+    def render(self, screen, offset_x, offset_y, cell_px, size):
+        """Draw the grid for a size x size cell map whose origin is at (offset_x, offset_y)"""
+        area = pygame.Rect(offset_x, offset_y, size * cell_px, size * cell_px).clip(screen.get_rect())
+        if area.width <= 0 or area.height <= 0:
+            return
+        surface = self.tile(cell_px, self.step_for(cell_px))
+        side = surface.get_width()
+        old_clip = screen.get_clip()
+        screen.set_clip(area)
+        # Tiles start on tile boundaries measured from the map origin
+        first_x = offset_x + (area.left - offset_x) // side * side
+        first_y = offset_y + (area.top - offset_y) // side * side
+        for x in range(first_x, area.right, side):
+            for y in range(first_y, area.bottom, side):
+                screen.blit(surface, (x, y))
+        screen.set_clip(old_clip)
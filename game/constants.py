@@ -3,6 +3,8 @@ WINDOW_WIDTH = 1024
 WINDOW_HEIGHT = 768
 FPS = 60
 TITLE = "Galactic Conquest"
+FIRST_FRAME_TARGET_MS = 100  # Warn if the first frame (loading screen) takes longer than this
+TEXT_CACHE_SIZE = 2048  # Rendered text surfaces kept before the least recently used are dropped
 
 # Colors
 WHITE = (255, 255, 255)
@@ -13,6 +15,7 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 DARK_BLUE = (0, 0, 50)
 GRID_COLOR = (50, 50, 50)
+PLAYER_COLORS = [(80, 160, 255), (255, 100, 100)]  # Player 1 blue, player 2 red
 
 # Galaxy map settings
 GALAXY_GRID_SIZE = 64
@@ -24,6 +27,34 @@ GALAXY_VIEW_PADDING = 50
 GALAXY_SIZE = 1000  # Huge galaxy to fit very distant systems
 GRID_SIZE = 40    # Size of each grid cell in pixels
 GRID_VIEW_PADDING = 20  # Padding around the grid view
+GRID_TILE_PX = 512  # Pre-rendered grid tiles are at most this many pixels per side
+GRID_TILE_CACHE = 8  # Zoom levels whose grid tiles are kept around
+GRID_MIN_CELL_PX = 4  # Below this cell size, draw a coarse grid instead of every cell
+COARSE_GRID_STEPS = (5, 10, 25, 50, 100)  # Cells between coarse grid lines, smallest that fits is used
+COARSE_GRID_MIN_PX = 16  # Minimum on-screen spacing of coarse grid lines
+LOD_ZOOM_THRESHOLD = 0.25  # Below this zoom, draw the map from the one-pixel-per-cell raster
+LOD_ASTEROID_COLOR = (120, 120, 120)
+SPATIAL_BUCKET = 32  # Cells per side of the render culling buckets
+FLEET_BUCKET = 16  # Cells per side of the buckets behind nearest/within ship queries
+PLANET_SURFACE_BUDGET = 64 * 1024 * 1024  # Bytes of cached planet surfaces kept before the least recently drawn are dropped
+TOOLTIP_SURFACE_BUDGET = 16 * 1024 * 1024  # Same for cached tooltip boxes
+MOVE_TILE_COLOR = (100, 150, 255)
+MOVE_TILE_BORDER = (0, 100, 255)
+MOVE_OVERLAY_CACHE = 4  # Move range overlays kept around
+REACH_MARGIN = 8  # Move ranges up to this are looked up from cached per-chunk terrain
+FLOW_FIELD_MARGIN = 16  # Cells past a group's move range searched for a way around obstacles
+DRAG_SELECT_MIN_PX = 6  # A left-button drag shorter than this is just a click
+SELECTION_BOX_COLOR = (120, 220, 120)
+BUILDER_RANGE = 6  # Grids between a builder ship and a planet it lets its owner build on
+BUILDABLE_HIGHLIGHT = (255, 215, 0)
+ECONOMY_CAPACITY = 1024  # Planet rows the production arrays start with, doubled when full
+
+# Minimap settings
+MINIMAP_SIZE = 200  # Pixels per side
+MINIMAP_MARGIN = 10  # Gap from the bottom-left corner of the window
+MINIMAP_TILE = 16  # Dirty minimap areas are recomputed this many pixels at a time
+MINIMAP_BACKGROUND = (15, 15, 25)
+MINIMAP_ASTEROID_COLOR = (90, 90, 90)
 
 # Planet grid settings
 PLANET_GRID_SIZE = 32
@@ -163,4 +194,25 @@ PLANET_BUILDING_RESTRICTIONS = {
     'TOXIC': ['Research Lab', 'Defense Platform', 'Research Station'],  # Harsh environment, limited options
 }
 
- 
\ No newline at end of file
+ # Star system settings
+SYSTEM_COUNT = (3, 8)  # Min/max randomly placed systems on top of the spawn systems
+SYSTEM_MIN_DISTANCE = 100  # Minimum distance between suns
+SYSTEM_SPAWN_MARGIN = 50  # Spawn systems sit this far in from opposite corners
+SUN_FOOTPRINT = 9  # Area kept clear when placing a sun
+PLANETS_PER_SYSTEM = (3, 5)  # Min/max planets orbiting each sun
+PLANET_ORBIT = (10, 19)  # Min/max planet distance from its sun
+PLANET_SIZE = (2, 6)  # Min/max planet size in grids
+PLANET_PLACEMENT_ATTEMPTS = 30  # Candidate positions tried per planet
+
+# Lazy sector settings (for galaxies too big to generate up front)
+SECTOR_SIZE = 256  # Cells per side of a sector; a multiple of the 64-cell grid chunks
+SECTOR_SYSTEMS = (0, 2)  # Min/max random systems per sector
+SECTOR_ASTEROID_PATCHES = (1, 3)  # Min/max asteroid patches per sector
+SECTOR_SYSTEM_MARGIN = SYSTEM_MIN_DISTANCE // 2  # Suns stay this far from sector edges
+MAX_LOADED_SECTORS = 64  # Untouched sectors beyond this are evicted, least recently used first
+
+# Asteroid field settings
+ASTEROID_PATCHES = (25, 40)  # Min/max number of asteroid patches per galaxy
+ASTEROID_PATCH_SIZE = (40, 80)  # Min/max asteroids per patch
+ASTEROID_PATCH_RADIUS = (12, 20)  # Min/max patch radius in grids
+ASTEROID_PLANET_CLEARANCE = 25  # Patch centers stay this many grids away from planets and suns
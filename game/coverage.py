@@ -0,0 +1,63 @@
+from .constants import *
+
+
+class BuilderCoverage:
+    """Which planets each player's builder ships are close enough to build on.
+
+    Keeps a count of builders in range per (player, planet), measured
+    from the planet's top-left cell like the build rule. Galaxy updates it
+    when a builder is added, moved or removed and when planets come and
+    go, so checking a planet is a single dict lookup. Suns can't be built
+    on and are left out.
+    """
+    def __init__(self, galaxy, radius=BUILDER_RANGE):
+        self.galaxy = galaxy
+        self.radius = radius
+        self.counts = {}  # (owner, id(planet)) -> builders in range
+
+    def clear(self):
+        self.counts.clear()
+
+    def covered(self, owner, planet):
+        return (owner, id(planet)) in self.counts
+
+    def _planets_near(self, pos):
+        x, y = pos
+        r = self.radius
+        for planet in self.galaxy.planet_index.query(x - r, y - r, x + r + 1, y + r + 1):
+            px, py = planet.grid_position
+            if planet.planet_type != 'SUN' and abs(px - x) + abs(py - y) <= r:
+                yield planet
+
+    def add_builder(self, ship, pos=None):
+        for planet in self._planets_near(pos or ship.grid_position):
+            key = (ship.owner, id(planet))
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def remove_builder(self, ship, pos=None):
+        for planet in self._planets_near(pos or ship.grid_position):
+            key = (ship.owner, id(planet))
+            count = self.counts.get(key, 0) - 1
+            if count > 0:
+                self.counts[key] = count
+            else:
+                self.counts.pop(key, None)
+
+    def move_builder(self, ship, old_pos, new_pos):
+        self.remove_builder(ship, old_pos)
+        self.add_builder(ship, new_pos)
+
+    def add_planet(self, planet):
+        if planet.planet_type == 'SUN':
+            return
+        fleets = self.galaxy.fleets
+        for owner, label in list(fleets.groups):
+            if label == 'BLD':
+                count = len(fleets.within(owner, 'BLD', planet.grid_position, self.radius))
+                if count:
+                    self.counts[(owner, id(planet))] = count
+
+    def remove_planet(self, planet):
+        for owner, label in list(self.galaxy.fleets.groups):
+            if label == 'BLD':
+                self.counts.pop((owner, id(planet)), None)
@@ -0,0 +1,99 @@
+import numpy as np
+from .constants import *
+from .reachability import OPEN, SHIP, relax
+
+FAR = 30000  # Step cost standing in for "no way through"; twice this still fits a uint16
+_RELAX_BATCH = 16  # Relaxation steps between checks for convergence
+_STEPS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])
+
+
+class FlowField:
+    """Step costs to one target cell over the area around a group of ships.
+
+    It is built once per group order, and every ship then walks downhill
+    from its own cell, so the group shares one search instead of running
+    one per ship. Planets, suns and ships outside the group block the
+    way, and asteroid cells cost two steps, as they do in Reachability.
+    The field only covers what the group can reach this turn plus margin
+    cells to find a way around obstacles. A target further away is
+    projected onto the edge of that window: every open edge cell starts
+    at its straight-line (Manhattan) distance to the target, so ships
+    head for the edge cell that leaves the least way to go.
+    """
+    def __init__(self, galaxy, target, ships, margin=FLOW_FIELD_MARGIN):
+        reach = max(ship.move_range for ship in ships) + margin
+        xs = [ship.grid_position[0] for ship in ships]
+        ys = [ship.grid_position[1] for ship in ships]
+        x0, y0 = max(0, min(xs) - reach), max(0, min(ys) - reach)
+        x1, y1 = min(galaxy.size, max(xs) + reach + 1), min(galaxy.size, max(ys) + reach + 1)
+        if galaxy.sectors is not None:
+            galaxy.sectors.ensure_rect(x0, y0, x1, y1)
+        # A blocked border all round keeps every neighbour lookup inside the arrays
+        self.x0, self.y0 = x0 - 1, y0 - 1
+        w, h = x1 - x0 + 2, y1 - y0 + 2
+        terrain = galaxy.reach.terrain_window(self.x0, self.y0, w, h)
+        cost = np.where(terrain >= SHIP, FAR, terrain).astype(np.uint16)
+        for ship in ships:
+            cost[self.local(ship.grid_position)] = OPEN  # The group makes way for itself
+        cost[0] = cost[-1] = cost[:, 0] = cost[:, -1] = FAR
+        self.target = tuple(target)
+        dist = np.full((1, w, h), FAR, dtype=np.uint16)
+        if x0 <= target[0] < x1 and y0 <= target[1] < y1:
+            # The target counts as open even when something sits on it, so ships gather around it
+            tx, ty = self.local(target)
+            cost[tx, ty] = OPEN
+            dist[0, tx, ty] = 0
+        else:
+            edge = np.zeros((w, h), dtype=bool)
+            edge[1, 1:-1] = edge[-2, 1:-1] = edge[1:-1, 1] = edge[1:-1, -2] = True
+            edge &= cost < FAR
+            ex, ey = np.nonzero(edge)
+            left = np.abs(ex + self.x0 - target[0]) + np.abs(ey + self.y0 - target[1])
+            # Only differences matter, and keeping them small keeps every sum inside a uint16
+            dist[0, ex, ey] = left - left.min() if len(left) else 0
+        while True:
+            before = dist.copy()
+            relax(dist, cost, _RELAX_BATCH, FAR)
+            if np.array_equal(before, dist):
+                break
+        self.dist = dist[0]  # Cost of the cheapest way from each cell to the target, counting the target
+        self.cost = cost
+
+    def local(self, pos):
+        return pos[0] - self.x0, pos[1] - self.y0
+
+    def distance(self, pos):
+        return int(self.dist[self.local(pos)])
+
+    def walk(self, ships):
+        """Cells each ship passes through heading for the target, within its move range.
+
+        Every ship steps to its cheapest neighbour for as long as that gets
+        it closer and it has movement left; all ships step together.
+        """
+        n = len(ships)
+        px = np.array([ship.grid_position[0] - self.x0 for ship in ships], dtype=np.int64)
+        py = np.array([ship.grid_position[1] - self.y0 for ship in ships], dtype=np.int64)
+        budget = np.array([ship.move_range for ship in ships], dtype=np.int64)
+        steps = int(budget.max()) if n else 0
+        history = np.empty((steps, 2, n), dtype=np.int64)
+        moved = np.zeros(n, dtype=np.int64)
+        walking = np.ones(n, dtype=bool)
+        ships_idx = np.arange(n)
+        for k in range(steps):
+            nx = px + _STEPS[:, 0, None]
+            ny = py + _STEPS[:, 1, None]
+            nd = self.dist[nx, ny]
+            best = nd.argmin(axis=0)
+            bx, by = nx[best, ships_idx], ny[best, ships_idx]
+            step_cost = self.cost[bx, by].astype(np.int64)
+            walking &= (nd[best, ships_idx] < self.dist[px, py]) & (step_cost <= budget)
+            if not walking.any():
+                break
+            px = np.where(walking, bx, px)
+            py = np.where(walking, by, py)
+            budget -= np.where(walking, step_cost, 0)
+            history[k, 0], history[k, 1] = px + self.x0, py + self.y0
+            moved += walking
+        hx, hy = history[:, 0].T.tolist(), history[:, 1].T.tolist()
+        return [list(zip(hx[i][:moved[i]], hy[i][:moved[i]])) for i in range(n)]
@@ -1,323 +1,390 @@
+import time
 import pygame
-import numpy as np
 from .constants import *
-from .planet import Planet, Sun, PLANET_TYPES, SUN_TYPES
+from .planet import Planet, Sun, SUN_TYPES
 from .unit import Ship, Frigate, Destroyer, Cruiser, Battleship, Carrier, Fighter, Bomber, BuilderShip, Corvette
+from .occupancy import OccupancyIndex
+from .asteroids import AsteroidField, PATCH_SHAPES, PATCH_OVERHANG, generate_patch, pick_patch_centers
+from .rng import GenerationContext
+from .galaxy_cache import cache_path, load_galaxy, save_galaxy
+from .systems import system_label, sample_sun_positions, build_system
+from .sectors import SectorMap
+from .text_cache import render_text
+from .background import GridBackground
+from .lod import LodRaster
+from .minimap import Minimap
+from .spatial import SpatialHash, FleetIndex
+from .move_range import MoveOverlay
+from .reachability import Reachability
+from .flow_field import FlowField
+from .coverage import BuilderCoverage
+from .production import ProductionLedger
 
 class Galaxy:
-    def __init__(self):
+    def __init__(self, seed=None, use_cache=True, size=GALAXY_SIZE, lazy=False, progress=None):
+        self.generation = GenerationContext(seed)  # Seeded RNG streams for world generation
+        print(f"Galaxy seed: {self.generation.seed}")
+        self.size = size  # Cells per side
         self.ships = []
         self.selected_unit = None
-        self.move_tiles = []
+        self.selected_ships = []  # Ships picked together with a box drag
+        self.move_tiles = set()
 
         self.offset_x = 0
         self.offset_y = 0
         self.dragging = False
         self.last_mouse_pos = None
         self.planets = []  # List of all planets
-        self.asteroids = []  # List of all asteroids
+        self.asteroids = AsteroidField()  # Packed asteroid cells
+        self.occupancy = OccupancyIndex()  # Cell -> ship/planet lookups
+        self.planet_index = SpatialHash()  # Planets/suns by area, for render culling
+        self.ship_index = SpatialHash()
+        self.fleets = FleetIndex()  # Ships by owner and type, for nearest/within rules
+        self.coverage = BuilderCoverage(self)  # Planets each player's builders can build on
+        self.production = ProductionLedger()  # Per-player income from owned planets
+        # Lazy galaxies generate sectors on demand instead of everything up front
+        self.sectors = SectorMap(self) if lazy else None
+        self.background = GridBackground()  # Cached grid tiles per zoom level
+        self.lod = LodRaster(self)  # Pixel-per-cell map for far zoom levels
+        self.minimap = Minimap(self)  # Whole-galaxy overview in the corner
+        self.move_overlay = MoveOverlay()
+        self.reach = Reachability(self)  # Where each ship can move, around obstacles
 
         self.pan_speed = 20  # Speed for panning
         self.zoom_level = 1.0  # Initial zoom level
         self.build_mode = False
         self.build_warning = None  # Store warning message for UI
         self.building_just_placed = False  # Track if a building was just placed
-        self.generate_planets()
-        self.generate_asteroids()
+        if self.sectors is None:
+            # Only explicitly seeded galaxies are cached; a random seed is unlikely to be asked for again
+            cache_file = cache_path(seed, size) if seed is not None and use_cache else None
+            if not (cache_file and self.load_cache(cache_file)):
+                self.generate_planets(progress=progress)
+                self.generate_asteroids(progress=progress)
+                if cache_file:
+                    save_galaxy(self, cache_file)
         self.spawn_ship()
 
+    def load_cache(self, path):
+        start = time.perf_counter()
+        if not load_galaxy(self, path):
+            return False
+        elapsed = (time.perf_counter() - start) * 1000
+        self.invalidate_views()
+        print(f"Loaded {len(self.planets)} planets and {len(self.asteroids)} asteroids from {path} in {elapsed:.1f} ms")
+        return True
+
     def is_space_free(self, x, y, size):
         # Check if the area (x, y, size) is at least 1 grid away from all existing planets
-        for obj in self.planets:
-            ox, oy = obj.grid_position
-            osize = obj.size
-            # Calculate bounding boxes with 1-grid buffer
-            if (x + size + 1 > ox and x < ox + osize + 1 and
-                y + size + 1 > oy and y < oy + osize + 1):
-                return False
-        return True
+        return self.occupancy.area_clear(x, y, size)
+
+    def ensure_loaded(self, pos):
+        # Make sure the sector under pos exists before looking at it (lazy galaxies only)
+        if self.sectors is not None:
+            self.sectors.ensure_cell(pos[0], pos[1])
+
+    def mark_changed(self, x, y, w, h):
+        # Cached views of the map redraw these cells next time they are shown
+        self.lod.mark_rect(x, y, w, h)
+        self.minimap.mark_rect(x, y, w, h)
+        self.reach.mark_rect(x, y, w, h)
 
-    def generate_planets(self):
-        import string
+    def mark_cell_changed(self, pos):
+        self.mark_changed(pos[0], pos[1], 1, 1)
+
+    def invalidate_views(self):
+        self.lod.invalidate()
+        self.minimap.invalidate()
+        self.reach.invalidate()
+
+    # Every change to planets and ships goes through these, so the indexes stay in sync
+    def add_planet(self, planet):
+        self.planets.append(planet)
+        self.occupancy.add_body(planet)
+        self.planet_index.insert(planet, planet.grid_position[0], planet.grid_position[1], planet.size, planet.size)
+        self.coverage.add_planet(planet)
+        self.production.add_planet(planet)
+        self.mark_changed(planet.grid_position[0], planet.grid_position[1], planet.size, planet.size)
+
+    def remove_planets(self, bodies):
+        gone = {id(body) for body in bodies}
+        self.planets = [planet for planet in self.planets if id(planet) not in gone]
+        for body in bodies:
+            self.occupancy.remove_body(body)
+            self.planet_index.remove(body)
+            self.coverage.remove_planet(body)
+            self.production.remove_planet(body)
+            self.mark_changed(body.grid_position[0], body.grid_position[1], body.size, body.size)
+
+    def clear_planets(self):
         self.planets.clear()
-        system_letters = list(string.ascii_uppercase)
-        system_index = 0
+        self.occupancy.clear_bodies()
+        self.planet_index.clear()
+        self.coverage.clear()
+        self.production.clear()
+        self.invalidate_views()
+
+    def add_ship(self, ship):
+        self.ensure_loaded(ship.grid_position)
+        self.ships.append(ship)
+        self.occupancy.add_ship(ship)
+        self.ship_index.insert(ship, ship.grid_position[0], ship.grid_position[1])
+        self.fleets.insert(ship)
+        if ship.label == 'BLD':
+            self.coverage.add_builder(ship)
+        self.mark_cell_changed(ship.grid_position)
+
+    def remove_ship(self, ship):
+        # Used when a ship leaves the map, e.g. docking into a Carrier
+        self.ships.remove(ship)
+        self.occupancy.remove_ship(ship)
+        self.ship_index.remove(ship)
+        self.fleets.remove(ship)
+        if ship.label == 'BLD':
+            self.coverage.remove_builder(ship)
+        self.mark_cell_changed(ship.grid_position)
+
+    def move_ship(self, ship, pos):
+        self.ensure_loaded(pos)
+        self.mark_cell_changed(ship.grid_position)
+        self._relocate(ship, pos)
+        self.mark_cell_changed(pos)
+
+    def move_ships(self, moves):
+        """Apply several (ship, pos) moves, marking the area they span as changed once"""
+        if not moves:
+            return
+        cells = [ship.grid_position for ship, _ in moves] + [pos for _, pos in moves]
+        for ship, pos in moves:
+            self.ensure_loaded(pos)
+            self._relocate(ship, pos)
+        x0, y0 = min(x for x, _ in cells), min(y for _, y in cells)
+        x1, y1 = max(x for x, _ in cells), max(y for _, y in cells)
+        self.mark_changed(x0, y0, x1 - x0 + 1, y1 - y0 + 1)
+
+    def place_building(self, planet, grid_x, grid_y, player_id, building_type):
+        if not planet.place_building(grid_x, grid_y, player_id, building_type):
+            return False
+        self.production.add_building(planet, building_type)
+        return True
+
+    def _relocate(self, ship, pos):
+        old_pos = ship.grid_position
+        self.occupancy.move_ship(ship, pos)
+        self.ship_index.move(ship, pos[0], pos[1])
+        self.fleets.move(ship, pos[0], pos[1])
+        if ship.label == 'BLD':
+            self.coverage.move_builder(ship, old_pos, pos)
+
+    def ship_at(self, pos):
+        return self.occupancy.ship_at(pos)
+
+    def nearest(self, owner, label, pos, where=None):
+        """Closest ship of owner with label (e.g. 'CAR') to pos, by Manhattan distance"""
+        return self.fleets.nearest(owner, label, pos, where)
+
+    def within(self, owner, label, pos, radius):
+        """Ships of owner with label at most radius cells (Manhattan) from pos"""
+        return self.fleets.within(owner, label, pos, radius)
+
+    def planet_at(self, pos):
+        self.ensure_loaded(pos)
+        return self.occupancy.body_at(pos)
+
+    def is_tile_open(self, pos):
+        x, y = pos
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return False
+        self.ensure_loaded(pos)
+        return not self.occupancy.is_blocked(pos)
+
+    def set_planet_owner(self, planet, owner):
+        planet.owner = owner
+        self.production.set_owner(planet, owner)
+        self.mark_changed(planet.grid_position[0], planet.grid_position[1], planet.size, planet.size)
+
+    def center_on(self, pos):
+        """Scroll so the given (possibly fractional) cell is in the middle of the window"""
+        cell_px = round(GRID_SIZE * self.zoom_level)
+        self.offset_x = WINDOW_WIDTH // 2 - int(pos[0] * cell_px)
+        self.offset_y = WINDOW_HEIGHT // 2 - int(pos[1] * cell_px)
+
+    def clear_selection(self):
+        # Only the selected unit or group can be selected, so there is no need to walk every ship and planet
+        if self.selected_unit:
+            self.selected_unit.set_selected(False)
+        self.selected_unit = None
+        for ship in self.selected_ships:
+            ship.set_selected(False)
+        self.selected_ships = []
+
+    def select_ship(self, ship):
+        self.clear_selection()
+        self.selected_unit = ship
+        ship.set_selected(True)
+
+        # Only show move tiles if ship has actions left
+        if hasattr(ship, 'actions_left') and ship.actions_left > 0:
+            self.move_tiles = self.get_move_tiles(ship)
+            print(f"DEBUG: Generated {len(self.move_tiles)} move tiles for {ship.label} with actions_left={ship.actions_left}, move_range={ship.move_range}")
+        else:
+            self.move_tiles = set()  # No movement allowed
+            print(f"DEBUG: {ship.label} has no actions left ({getattr(ship, 'actions_left', 'N/A')})")
+
+        self.build_mode = False  # Not in build mode for ships
+
+    def select_ships_in_rect(self, rect, current_player):
+        """Select every ship of current_player inside a rectangle of screen pixels"""
+        scaled_grid_size = round(GRID_SIZE * self.zoom_level)
+        x0 = (rect.left - self.offset_x) // scaled_grid_size
+        y0 = (rect.top - self.offset_y) // scaled_grid_size
+        x1 = (rect.right - 1 - self.offset_x) // scaled_grid_size + 1
+        y1 = (rect.bottom - 1 - self.offset_y) // scaled_grid_size + 1
+        ships = [ship for ship in self.ship_index.query(x0, y0, x1, y1)
+                 if ship.owner == current_player and x0 <= ship.grid_position[0] < x1 and y0 <= ship.grid_position[1] < y1]
+        self.build_warning = None
+        if len(ships) == 1:
+            self.select_ship(ships[0])
+            return
+        self.clear_selection()
+        self.build_mode = False
+        self.move_tiles = set()
+        for ship in ships:
+            ship.set_selected(True)
+        self.selected_ships = ships
+        print(f"Selected {len(ships)} ships")
+
+    def move_group(self, target):
+        """Send every selected ship with actions left toward target along one shared flow field"""
+        ships = [ship for ship in self.selected_ships if ship.actions_left > 0]
+        if not ships:
+            print("DEBUG: No selected ship has actions left")
+            return 0
+        field = FlowField(self, target, ships)
+        paths = field.walk(ships)
+        # Ships that end up nearest the target go first, so the ones behind can take the cells they leave
+        order = sorted(range(len(ships)), key=lambda i: field.distance(paths[i][-1]) if paths[i] else field.distance(ships[i].grid_position))
+        moves = []
+        claimed = set()
+        vacated = set()
+        for i in order:
+            ship = ships[i]
+            # Stop short if the end of the path is already taken
+            for cell in reversed(paths[i]):
+                if cell not in claimed and (cell in vacated or self.ship_at(cell) is None):
+                    claimed.add(cell)
+                    vacated.add(ship.grid_position)
+                    moves.append((ship, cell))
+                    break
+        self.move_ships(moves)
+        for ship, _ in moves:
+            ship.actions_left -= 1
+        print(f"Moved {len(moves)} of {len(ships)} ships toward {target}")
+        return len(moves)
+
+    def spawn_points(self):
         # Ensure at least one system near the spawn corners, but slightly away
-        spawn_systems = [(50, 50), (GALAXY_SIZE - 50, GALAXY_SIZE - 50)]
-        sun_positions = []
-        for spawn_x, spawn_y in spawn_systems:
-            if not self.is_space_free(spawn_x, spawn_y, 9):
-                continue
-            system_label = system_letters[system_index % len(system_letters)]
-            sun_type = list(SUN_TYPES.keys())[system_index % len(SUN_TYPES)]
-            sun = Sun(sun_type, (spawn_x, spawn_y), system_label)
-            self.planets.append(sun)
-            sun_positions.append((spawn_x, spawn_y))
-            print(f"Star ({system_label}-{sun_type}) placed at: ({spawn_x}, {spawn_y})")
-            # Generate planets around the sun
-            num_planets = np.random.randint(3, 6)
-            for planet_num in range(num_planets):
-                for attempt in range(30):
-                    angle = np.random.uniform(0, 2 * np.pi)
-                    distance = np.random.randint(10, 20)
-                    planet_type = list(PLANET_TYPES.keys())[np.random.randint(0, len(PLANET_TYPES))]
-                    planet_size = np.random.randint(2, 7)
-                    x = int(spawn_x + distance * np.cos(angle))
-                    y = int(spawn_y + distance * np.sin(angle))
-                    if self.is_space_free(x, y, planet_size):
-                        planet = Planet(planet_type, (x, y), size=planet_size, system_label=system_label)
-                        self.planets.append(planet)
-                        break
-            system_index += 1
-
-        # Randomly generate the rest of the systems
-        num_systems = np.random.randint(3, 9)  # Adjust as needed
-        min_distance = 100  # Minimum distance between suns
-        for _ in range(num_systems):
-            for attempt in range(100):  # Try up to 100 times to find a valid position
-                sun_x = np.random.randint(0, GALAXY_SIZE - 9)
-                sun_y = np.random.randint(0, GALAXY_SIZE - 9)
-                if not self.is_space_free(sun_x, sun_y, 9):
-                    continue
-                too_close = False
-                for (other_x, other_y) in sun_positions:
-                    if ((sun_x - other_x) ** 2 + (sun_y - other_y) ** 2) ** 0.5 < min_distance:
-                        too_close = True
-                        break
-                if not too_close:
-                    system_label = system_letters[system_index % len(system_letters)]
-                    sun_type = list(SUN_TYPES.keys())[system_index % len(SUN_TYPES)]
-                    sun = Sun(sun_type, (sun_x, sun_y), system_label)
-                    self.planets.append(sun)
-                    sun_positions.append((sun_x, sun_y))
-                    print(f"Star ({system_label}-{sun_type}) placed at: ({sun_x}, {sun_y})")
-                    # Generate planets around the sun
-                    num_planets = np.random.randint(3, 6)
-                    for planet_num in range(num_planets):
-                        for attempt in range(30):
-                            angle = np.random.uniform(0, 2 * np.pi)
-                            distance = np.random.randint(10, 20)
-                            planet_type = list(PLANET_TYPES.keys())[np.random.randint(0, len(PLANET_TYPES))]
-                            planet_size = np.random.randint(2, 7)
-                            x = int(sun_x + distance * np.cos(angle))
-                            y = int(sun_y + distance * np.sin(angle))
-                            if self.is_space_free(x, y, planet_size):
-                                planet = Planet(planet_type, (x, y), size=planet_size, system_label=system_label)
-                                self.planets.append(planet)
-                                break
-                    system_index += 1
-                    break  # Sun placed, move to next system
+        far = self.size - SYSTEM_SPAWN_MARGIN
+        return [(SYSTEM_SPAWN_MARGIN, SYSTEM_SPAWN_MARGIN), (far, far)]
+
+    def generate_planets(self, num_systems=None, min_distance=SYSTEM_MIN_DISTANCE, rng=None, progress=None):
+        rng = rng or self.generation.stream('systems')
+        self.clear_planets()
+        spawn_systems = self.spawn_points()
+        # Randomly place the rest of the systems
+        if num_systems is None:
+            num_systems = int(rng.integers(SYSTEM_COUNT[0], SYSTEM_COUNT[1] + 1))
+        bounds = (0, 0, self.size - SUN_FOOTPRINT, self.size - SUN_FOOTPRINT)
+        sun_positions = spawn_systems + sample_sun_positions(
+            rng, num_systems, min_distance, bounds, fixed=spawn_systems,
+            is_free=lambda x, y: self.is_space_free(x, y, SUN_FOOTPRINT))
+        
+        sun_types = list(SUN_TYPES.keys())
+        systems = [(pos, system_label(i), sun_types[i % len(sun_types)]) for i, pos in enumerate(sun_positions)]
+        self.place_systems(systems, rng, self.generation.stream('resources'), progress)
 
         print(f"Total planets generated: {len(self.planets)}")
         print(f"Sun positions: {sun_positions}")
 
-    def generate_asteroids(self):
+    def place_systems(self, systems, rng, resource_rng, progress=None):
+        """Add a sun for each (position, label, sun_type), then build and merge their planets.
+
+        Returns every body that was added. progress, if given, is called as
+        progress('systems', done, total) after each system is merged.
+        """
+        # Place every sun first so planets never land on another system's star
+        suns = []
+        for (sun_x, sun_y), label, sun_type in systems:
+            sun = Sun(sun_type, (sun_x, sun_y), label, rng=resource_rng)
+            self.add_planet(sun)
+            suns.append(sun)
+            print(f"Star ({label}-{sun_type}) placed at: ({sun_x}, {sun_y})")
+        
+        # Each system gets its own seed, so its planets don't depend on the systems before it
+        seeds = rng.integers(0, 2 ** 63 - 1, len(suns)).tolist()
+        tasks = [(sun.grid_position[0], sun.grid_position[1], sun.size, seed, self.size) for sun, seed in zip(suns, seeds)]
+        bodies = list(suns)
+        for done, (sun, planets) in enumerate(zip(suns, map(build_system, tasks)), 1):
+            for planet_type, x, y, planet_size in planets:
+                # Systems are built in isolation, so check against neighbours while merging
+                if self.is_space_free(x, y, planet_size):
+                    planet = Planet(planet_type, (x, y), size=planet_size, system_label=sun.system_label, rng=resource_rng)
+                    self.add_planet(planet)
+                    bodies.append(planet)
+            if progress:
+                progress('systems', done, len(suns))
+        return bodies
+
+    def generate_asteroids(self, num_patches=None, rng=None, progress=None):
         """Generate dense asteroid field patches scattered throughout the galaxy"""
-        import random
+        rng = rng or self.generation.stream('asteroids')
         self.asteroids.clear()
+        self.invalidate_views()
         
-        # Generate 25-40 asteroid field patches (even more patches)
-        num_asteroid_patches = random.randint(25, 40)
+        if num_patches is None:
+            num_patches = int(rng.integers(ASTEROID_PATCHES[0], ASTEROID_PATCHES[1] + 1))
         
-        for patch_num in range(num_asteroid_patches):
-            # Find a center point for this patch
-            for attempt in range(50):  # Try up to 50 times to find a valid center
-                center_x = random.randint(20, GALAXY_SIZE - 20)
-                center_y = random.randint(20, GALAXY_SIZE - 20)
-                
-                # Check if center is far enough from planets and suns
-                too_close = False
-                for planet in self.planets:
-                    px, py = planet.grid_position
-                    distance = ((center_x - px) ** 2 + (center_y - py) ** 2) ** 0.5
-                    if distance < 25:  # At least 25 grids away from planets
-                        too_close = True
-                        break
-                
-                if not too_close:
-                    # Choose a random patch shape
-                    patch_shapes = ['cluster', 'line', 'ring', 'scattered', 'dense_core', 'spiral']
-                    patch_shape = random.choice(patch_shapes)
-                    
-                    # Create different shaped patches with 40-80 asteroids
-                    asteroids_in_patch = random.randint(40, 80)
-                    patch_radius = random.randint(12, 20)
-                    
-                    if patch_shape == 'cluster':
-                        # Dense circular cluster
-                        for _ in range(asteroids_in_patch):
-                            for asteroid_attempt in range(20):
-                                offset_x = random.randint(-patch_radius//2, patch_radius//2)
-                                offset_y = random.randint(-patch_radius//2, patch_radius//2)
-                                x = center_x + offset_x
-                                y = center_y + offset_y
-                                
-                                if 0 <= x < GALAXY_SIZE and 0 <= y < GALAXY_SIZE:
-                                    position_free = True
-                                    for existing_asteroid in self.asteroids:
-                                        if existing_asteroid['position'] == (x, y):
-                                            position_free = False
-                                            break
-                                    
-                                    if position_free:
-                                        asteroid = {'position': (x, y), 'type': 'asteroid'}
-                                        self.asteroids.append(asteroid)
-                                        break
-                    
-                    elif patch_shape == 'line':
-                        # Linear asteroid belt
-                        angle = random.uniform(0, 2 * 3.14159)  # Random direction
-                        for i in range(asteroids_in_patch):
-                            distance = random.randint(-patch_radius, patch_radius)
-                            perpendicular_offset = random.randint(-3, 3)  # Small perpendicular spread
-                            
-                            x = center_x + int(distance * 0.7071) + int(perpendicular_offset * 0.7071)  # cos/sin approximation
-                            y = center_y + int(distance * 0.7071) + int(perpendicular_offset * -0.7071)
-                            
-                            if 0 <= x < GALAXY_SIZE and 0 <= y < GALAXY_SIZE:
-                                position_free = True
-                                for existing_asteroid in self.asteroids:
-                                    if existing_asteroid['position'] == (x, y):
-                                        position_free = False
-                                        break
-                                
-                                if position_free:
-                                    asteroid = {'position': (x, y), 'type': 'asteroid'}
-                                    self.asteroids.append(asteroid)
-                    
-                    elif patch_shape == 'ring':
-                        # Ring-shaped asteroid field
-                        inner_radius = patch_radius // 3
-                        outer_radius = patch_radius
-                        for _ in range(asteroids_in_patch):
-                            for asteroid_attempt in range(20):
-                                angle = random.uniform(0, 2 * 3.14159)
-                                radius = random.randint(inner_radius, outer_radius)
-                                
-                                x = center_x + int(radius * 0.7071)  # Approximate cos
-                                y = center_y + int(radius * 0.7071)  # Approximate sin
-                                
-                                if 0 <= x < GALAXY_SIZE and 0 <= y < GALAXY_SIZE:
-                                    position_free = True
-                                    for existing_asteroid in self.asteroids:
-                                        if existing_asteroid['position'] == (x, y):
-                                            position_free = False
-                                            break
-                                    
-                                    if position_free:
-                                        asteroid = {'position': (x, y), 'type': 'asteroid'}
-                                        self.asteroids.append(asteroid)
-                                        break
-                    
-                    elif patch_shape == 'scattered':
-                        # Wide scattered field
-                        for _ in range(asteroids_in_patch):
-                            for asteroid_attempt in range(20):
-                                offset_x = random.randint(-patch_radius, patch_radius)
-                                offset_y = random.randint(-patch_radius, patch_radius)
-                                x = center_x + offset_x
-                                y = center_y + offset_y
-                                
-                                if 0 <= x < GALAXY_SIZE and 0 <= y < GALAXY_SIZE:
-                                    position_free = True
-                                    for existing_asteroid in self.asteroids:
-                                        if existing_asteroid['position'] == (x, y):
-                                            position_free = False
-                                            break
-                                    
-                                    if position_free:
-                                        asteroid = {'position': (x, y), 'type': 'asteroid'}
-                                        self.asteroids.append(asteroid)
-                                        break
-                    
-                    elif patch_shape == 'dense_core':
-                        # Dense center with sparse outer ring
-                        core_asteroids = asteroids_in_patch // 2
-                        outer_asteroids = asteroids_in_patch - core_asteroids
-                        
-                        # Dense core
-                        for _ in range(core_asteroids):
-                            for asteroid_attempt in range(20):
-                                offset_x = random.randint(-patch_radius//3, patch_radius//3)
-                                offset_y = random.randint(-patch_radius//3, patch_radius//3)
-                                x = center_x + offset_x
-                                y = center_y + offset_y
-                                
-                                if 0 <= x < GALAXY_SIZE and 0 <= y < GALAXY_SIZE:
-                                    position_free = True
-                                    for existing_asteroid in self.asteroids:
-                                        if existing_asteroid['position'] == (x, y):
-                                            position_free = False
-                                            break
-                                    
-                                    if position_free:
-                                        asteroid = {'position': (x, y), 'type': 'asteroid'}
-                                        self.asteroids.append(asteroid)
-                                        break
-                        
-                        # Sparse outer ring
-                        for _ in range(outer_asteroids):
-                            for asteroid_attempt in range(20):
-                                offset_x = random.randint(-patch_radius, patch_radius)
-                                offset_y = random.randint(-patch_radius, patch_radius)
-                                # Skip if too close to center
-                                if abs(offset_x) < patch_radius//2 and abs(offset_y) < patch_radius//2:
-                                    continue
-                                    
-                                x = center_x + offset_x
-                                y = center_y + offset_y
-                                
-                                if 0 <= x < GALAXY_SIZE and 0 <= y < GALAXY_SIZE:
-                                    position_free = True
-                                    for existing_asteroid in self.asteroids:
-                                        if existing_asteroid['position'] == (x, y):
-                                            position_free = False
-                                            break
-                                    
-                                    if position_free:
-                                        asteroid = {'position': (x, y), 'type': 'asteroid'}
-                                        self.asteroids.append(asteroid)
-                                        break
-                    
-                    elif patch_shape == 'spiral':
-                        # Spiral pattern
-                        for i in range(asteroids_in_patch):
-                            angle = (i / asteroids_in_patch) * 4 * 3.14159  # 2 full rotations
-                            radius = (i / asteroids_in_patch) * patch_radius
-                            
-                            x = center_x + int(radius * 0.7071) + random.randint(-2, 2)  # Add some randomness
-                            y = center_y + int(radius * 0.7071) + random.randint(-2, 2)
-                            
-                            if 0 <= x < GALAXY_SIZE and 0 <= y < GALAXY_SIZE:
-                                position_free = True
-                                for existing_asteroid in self.asteroids:
-                                    if existing_asteroid['position'] == (x, y):
-                                        position_free = False
-                                        break
-                                
-                                if position_free:
-                                    asteroid = {'position': (x, y), 'type': 'asteroid'}
-                                    self.asteroids.append(asteroid)
-                    
-                    print(f"Generated {patch_shape} asteroid patch {patch_num + 1} at ({center_x}, {center_y}) with {len([a for a in self.asteroids if abs(a['position'][0] - center_x) <= patch_radius and abs(a['position'][1] - center_y) <= patch_radius])} asteroids")
-                    break
+        placed_patches = self.place_asteroid_patches(rng, num_patches, (20, 20, self.size - 20, self.size - 20), self.planets, progress)
         
-        print(f"Generated {len(self.asteroids)} total asteroids in {num_asteroid_patches} patches")
+        print(f"Generated {len(self.asteroids)} total asteroids in {placed_patches} patches")
+
+    def place_asteroid_patches(self, rng, num_patches, bounds, obstacles, progress=None):
+        # Patch centers must be far enough from planets and suns
+        centers = pick_patch_centers(rng, num_patches, [body.grid_position for body in obstacles], bounds)
+        shapes = list(PATCH_SHAPES)
+        
+        for patch_num, center in enumerate(centers):
+            patch_shape = shapes[rng.integers(len(shapes))]
+            asteroids_in_patch = int(rng.integers(ASTEROID_PATCH_SIZE[0], ASTEROID_PATCH_SIZE[1] + 1))
+            patch_radius = int(rng.integers(ASTEROID_PATCH_RADIUS[0], ASTEROID_PATCH_RADIUS[1] + 1))
+            placed = generate_patch(self.asteroids, rng, center, patch_shape, asteroids_in_patch, patch_radius, self.size)
+            # Shapes may jitter a few cells past their radius
+            reach = patch_radius + PATCH_OVERHANG
+            self.mark_changed(center[0] - reach, center[1] - reach, 2 * reach + 1, 2 * reach + 1)
+            print(f"Generated {patch_shape} asteroid patch {patch_num + 1} at {center} with {placed} asteroids")
+            if progress:
+                progress('asteroid patches', patch_num + 1, len(centers))
+        return len(centers)
 
     def spawn_ship(self):
         self.ships.clear()
+        self.occupancy.clear_ships()
+        self.ship_index.clear()
+        self.fleets.clear()
+        self.coverage.clear()
+        self.invalidate_views()
         # Player 1 ships
-        self.ships.append(BuilderShip((0, 0), owner=0))
-        self.ships.append(Carrier((2, 0), owner=0))
-        self.ships.append(Corvette((0, 2), owner=0))
-        self.ships.append(Frigate((2, 2), owner=0))
-        self.ships.append(Destroyer((0, 4), owner=0))
-        self.ships.append(Cruiser((2, 4), owner=0))
-        self.ships.append(Battleship((0, 6), owner=0))
-        self.ships.append(Fighter((2, 6), owner=0))
-        self.ships.append(Bomber((0, 8), owner=0))
+        self.add_ship(BuilderShip((0, 0), owner=0))
+        self.add_ship(Carrier((2, 0), owner=0))
+        self.add_ship(Corvette((0, 2), owner=0))
+        self.add_ship(Frigate((2, 2), owner=0))
+        self.add_ship(Destroyer((0, 4), owner=0))
+        self.add_ship(Cruiser((2, 4), owner=0))
+        self.add_ship(Battleship((0, 6), owner=0))
+        self.add_ship(Fighter((2, 6), owner=0))
+        self.add_ship(Bomber((0, 8), owner=0))
         # Player 2 BuilderShip
-        self.ships.append(BuilderShip((GALAXY_SIZE-1, GALAXY_SIZE-1), owner=1))
+        self.add_ship(BuilderShip((self.size-1, self.size-1), owner=1))
 
     def handle_click(self, pos, current_player):
         from .constants import GRID_SIZE
@@ -328,9 +395,6 @@ class Galaxy:
         selected_building_type = getattr(self, 'selected_building_type', None)
         
         print(f"Clicked grid: ({grid_x}, {grid_y}), current_player: {current_player}")
-        print("Ships:")
-        for ship in self.ships:
-            print(f"  {ship.label} at {ship.grid_position}, owner: {ship.owner}")
         
         # --- DEBUG: Print move_tiles and click for ship movement ---
         if self.selected_unit and getattr(self.selected_unit, 'unit_type', None) == 'SHIP':
@@ -338,53 +402,34 @@ class Galaxy:
         
         # --- LOGIC ORDER ---
         # 1. Ship selection (highest priority)
-        # 2. Ship movement (if selected and click is in move_tiles)
+        # 2. Ship movement (if selected and click is in move_tiles, or a group order)
         # 3. Planet clicks (selection or building placement)
         # 4. Deselect if nothing found
         
         # Find clicked ship
-        clicked_ship = None
-        for ship in self.ships:
-            if ship.grid_position[0] == grid_x and ship.grid_position[1] == grid_y:
-                clicked_ship = ship
-                print(f"Clicked ship found: {ship.label} at {ship.grid_position}, owner: {ship.owner}, current_player: {current_player}")
-                break
+        clicked_ship = self.ship_at((grid_x, grid_y))
+        if clicked_ship:
+            print(f"Clicked ship found: {clicked_ship.label} at {clicked_ship.grid_position}, owner: {clicked_ship.owner}, current_player: {current_player}")
         
         # Find clicked planet
-        clicked_planet = None
-        for planet in self.planets:
-            px, py = planet.grid_position
-            if px <= grid_x < px + planet.size and py <= grid_y < py + planet.size:
-                clicked_planet = planet
-                print(f"Clicked planet found: {getattr(planet, 'system_label', '?')}-{getattr(planet, 'type_label', '?')} at {planet.grid_position} (size {planet.size})")
-                break
+        clicked_planet = self.planet_at((grid_x, grid_y))
+        if clicked_planet:
+            print(f"Clicked planet found: {getattr(clicked_planet, 'system_label', '?')}-{getattr(clicked_planet, 'type_label', '?')} at {clicked_planet.grid_position} (size {clicked_planet.size})")
         
         # 1. Ship selection (HIGHEST PRIORITY)
         if clicked_ship:
             if clicked_ship.owner == current_player:
                 print(f"Selecting ship: {clicked_ship.label}")
-                # Clear previous selections
-                for s in self.ships:
-                    s.set_selected(False)
-                for p in self.planets:
-                    p.selected = False
-                
-                self.selected_unit = clicked_ship
-                clicked_ship.set_selected(True)
-                
-                # Only show move tiles if ship has actions left
-                if hasattr(clicked_ship, 'actions_left') and clicked_ship.actions_left > 0:
-                    self.move_tiles = self.get_move_tiles(clicked_ship)
-                    print(f"DEBUG: Generated {len(self.move_tiles)} move tiles for {clicked_ship.label} with actions_left={clicked_ship.actions_left}, move_range={clicked_ship.move_range}")
-                else:
-                    self.move_tiles = []  # No movement allowed
-                    print(f"DEBUG: {clicked_ship.label} has no actions left ({getattr(clicked_ship, 'actions_left', 'N/A')})")
-                
-                self.build_mode = False  # Not in build mode for ships
+                self.select_ship(clicked_ship)
                 return
-            else:
+            elif not self.selected_ships:
                 print(f"Cannot select {clicked_ship.label} - owned by player {clicked_ship.owner}, current player is {current_player}")
                 return
+
+        # 2a. Group movement (if several ships are selected and the click is not on a planet)
+        if self.selected_ships and not clicked_planet:
+            self.move_group((grid_x, grid_y))
+            return
         
         # 2. Ship movement (if ship is selected and click is in move tiles)
         if self.selected_unit and getattr(self.selected_unit, 'unit_type', None) == 'SHIP':
@@ -400,28 +445,24 @@ class Galaxy:
                 # Check if destination is occupied by another ship or planet
                 occupied = False
                 docking_carrier = None
-                for ship in self.ships:
-                    if ship.grid_position == (grid_x, grid_y):
-                        # Check for docking with friendly Carrier
-                        if (ship.label == 'CAR' and self.selected_unit.label in ('FIG', 'BOM') and ship.owner == self.selected_unit.owner):
-                            docking_carrier = ship
-                        else:
-                            occupied = True
-                        break
-                for planet in self.planets:
-                    px, py = planet.grid_position
-                    if px <= grid_x < px + planet.size and py <= grid_y < py + planet.size:
+                ship = self.ship_at((grid_x, grid_y))
+                if ship:
+                    # Check for docking with friendly Carrier
+                    if (ship.label == 'CAR' and self.selected_unit.label in ('FIG', 'BOM') and ship.owner == self.selected_unit.owner):
+                        docking_carrier = ship
+                    else:
                         occupied = True
-                        break
+                if self.planet_at((grid_x, grid_y)):
+                    occupied = True
                 if docking_carrier and not occupied:
                     # Dock the fighter/bomber
                     if docking_carrier.can_dock(self.selected_unit):
                         docking_carrier.dock_unit(self.selected_unit)
                         print(f"DEBUG: {self.selected_unit.label} docked with Carrier at {docking_carrier.grid_position}")
-                        self.ships.remove(self.selected_unit)
+                        self.remove_ship(self.selected_unit)
                         self.selected_unit.set_selected(False)
                         self.selected_unit = None
-                        self.move_tiles = []
+                        self.move_tiles = set()
                         self.build_mode = False
                         return
                     else:
@@ -429,7 +470,7 @@ class Galaxy:
                         return
                 if not occupied:
                     print(f"Moving ship {self.selected_unit.label} to ({grid_x}, {grid_y})")
-                    self.selected_unit.grid_position = (grid_x, grid_y)
+                    self.move_ship(self.selected_unit, (grid_x, grid_y))
                     if hasattr(self.selected_unit, 'actions_left'):
                         self.selected_unit.actions_left -= 1
                         print(f"DEBUG: {self.selected_unit.label} actions_left now {self.selected_unit.actions_left}")
@@ -438,7 +479,7 @@ class Galaxy:
                     if hasattr(self.selected_unit, 'actions_left') and self.selected_unit.actions_left > 0:
                         self.move_tiles = self.get_move_tiles(self.selected_unit)
                     else:
-                        self.move_tiles = []
+                        self.move_tiles = set()
                     return
         
         # 3. Handle planet clicks (selection or building placement)
@@ -450,18 +491,9 @@ class Galaxy:
                 grid_cell_x = grid_x - px
                 grid_cell_y = grid_y - py
                 
-                # Require builder ship within 6 grids
-                builder_in_range = False
-                for ship in self.ships:
-                    if ship.unit_type == 'SHIP' and getattr(ship, 'label', None) == 'BLD' and ship.owner == current_player:
-                        sx, sy = ship.grid_position
-                        distance = abs(sx - px) + abs(sy - py)
-                        if distance <= 6:
-                            builder_in_range = True
-                            break
-                
-                if not builder_in_range:
-                    self.build_warning = 'A builder ship must be within 6 grids of this planet to build!'
+                # Require builder ship within BUILDER_RANGE grids
+                if not self.coverage.covered(current_player, clicked_planet):
+                    self.build_warning = f'A builder ship must be within {BUILDER_RANGE} grids of this planet to build!'
                     print(f"DEBUG: No builder in range for planet at {px}, {py}")
                     return  # Don't reselect planet, just show warning
                 
@@ -475,12 +507,14 @@ class Galaxy:
                         return  # Don't reselect planet, just show warning
                     
                     # Try to place the building
-                    if clicked_planet.place_building(grid_cell_x, grid_cell_y, current_player, selected_building_type):
+                    if self.place_building(clicked_planet, grid_cell_x, grid_cell_y, current_player, selected_building_type):
                         print(f"Building placed at ({grid_cell_x}, {grid_cell_y}) for player {current_player} type {selected_building_type}")
                         self.building_just_placed = True  # Mark that a building was successfully placed
+                        if self.sectors is not None:
+                            self.sectors.pin(clicked_planet.grid_position)  # Buildings can't be regenerated
                         # Assign planet ownership if not already owned
                         if not hasattr(clicked_planet, 'owner') or clicked_planet.owner is None:
-                            clicked_planet.owner = current_player
+                            self.set_planet_owner(clicked_planet, current_player)
                             print(f"Planet {clicked_planet.system_label}-{clicked_planet.type_label} now owned by player {current_player}")
                         return  # Building placed successfully, don't reselect
                     else:
@@ -497,14 +531,11 @@ class Galaxy:
             else:
                 print(f"Selecting planet: {getattr(clicked_planet, 'system_label', '?')}-{getattr(clicked_planet, 'type_label', '?')}")
                 # Clear previous selections
-                for s in self.ships:
-                    s.set_selected(False)
-                for p in self.planets:
-                    p.selected = False
+                self.clear_selection()
                 
                 self.selected_unit = clicked_planet
                 clicked_planet.selected = True
-                self.move_tiles = []
+                self.move_tiles = set()
                 # Enter build mode if buildable, else just show tooltip
                 if hasattr(clicked_planet, 'can_build') and clicked_planet.can_build(current_player) and getattr(clicked_planet, 'planet_type', None) != 'SUN':
                     self.build_mode = True
@@ -517,22 +548,16 @@ class Galaxy:
         # 4. Deselect if nothing found (only if we didn't click on anything valid)
         print("Deselecting unit.")
         # Clear previous selections
-        for s in self.ships:
-            s.set_selected(False)
-        for p in self.planets:
-            p.selected = False
+        self.clear_selection()
         self.build_mode = False  # Exit build mode on deselect
-        self.selected_unit = None
         self.build_warning = None
-        self.move_tiles = []  # Clear move tiles
+        self.move_tiles = set()  # Clear move tiles
 
     def get_move_tiles(self, ship):
-        tiles = []
-        for x in range(max(0, ship.grid_position[0] - ship.move_range), min(GALAXY_SIZE, ship.grid_position[0] + ship.move_range + 1)):
-            for y in range(max(0, ship.grid_position[1] - ship.move_range), min(GALAXY_SIZE, ship.grid_position[1] + ship.move_range + 1)):
-                if abs(x - ship.grid_position[0]) + abs(y - ship.grid_position[1]) <= ship.move_range:
-                    tiles.append((x, y))
-        return tiles
+        x, y = ship.grid_position
+        if self.sectors is not None:
+            self.sectors.ensure_rect(x - ship.move_range, y - ship.move_range, x + ship.move_range + 1, y + ship.move_range + 1)
+        return self.reach.of(ship).tiles
 
     def handle_mouse_down(self, pos):
         self.dragging = True
@@ -569,8 +594,8 @@ class Galaxy:
 
     def draw(self, screen):
         # Draw grid
-        for x in range(0, GALAXY_SIZE * GRID_SIZE, GRID_SIZE):
-            for y in range(0, GALAXY_SIZE * GRID_SIZE, GRID_SIZE):
+        for x in range(0, self.size * GRID_SIZE, GRID_SIZE):
+            for y in range(0, self.size * GRID_SIZE, GRID_SIZE):
                 rect = pygame.Rect(x + self.offset_x, y + self.offset_y, GRID_SIZE, GRID_SIZE)
                 pygame.draw.rect(screen, (50, 50, 50), rect, 1)
         
@@ -607,7 +632,7 @@ class Galaxy:
     def handle_pan(self, dx, dy):
         self.offset_x += dx * self.pan_speed
         self.offset_y += dy * self.pan_speed
-        max_offset = GALAXY_SIZE * GRID_SIZE
+        max_offset = self.size * GRID_SIZE
         self.offset_x = max(-max_offset, min(max_offset, self.offset_x))
         self.offset_y = max(-max_offset, min(max_offset, self.offset_y))
 
@@ -622,52 +647,61 @@ class Galaxy:
         if keys[pygame.K_DOWN] or keys[pygame.K_s]:
             self.handle_pan(0, -1)
 
-    def render(self, screen):
+    def render(self, screen, current_player=None):
         # Calculate visible grid range
         from .constants import WINDOW_WIDTH, WINDOW_HEIGHT
         scaled_grid_size = round(GRID_SIZE * self.zoom_level)
         start_x = max(0, (-self.offset_x) // scaled_grid_size)
-        end_x = min(GALAXY_SIZE, (WINDOW_WIDTH - self.offset_x) // scaled_grid_size + 2)
+        end_x = min(self.size, (WINDOW_WIDTH - self.offset_x) // scaled_grid_size + 2)
         start_y = max(0, (-self.offset_y) // scaled_grid_size)
-        end_y = min(GALAXY_SIZE, (WINDOW_HEIGHT - self.offset_y) // scaled_grid_size + 2)
+        end_y = min(self.size, (WINDOW_HEIGHT - self.offset_y) // scaled_grid_size + 2)
+        if self.sectors is not None:
+            # Generate what just scrolled into view and forget sectors nobody is looking at
+            visible = self.sectors.ensure_rect(start_x, start_y, end_x, end_y)
+            self.sectors.trim(keep=visible)
 
-        # Draw grid (only visible cells)
-        for x in range(start_x, end_x):
-            for y in range(start_y, end_y):
-                rect = pygame.Rect(x * scaled_grid_size + self.offset_x, y * scaled_grid_size + self.offset_y, scaled_grid_size, scaled_grid_size)
-                pygame.draw.rect(screen, (50, 50, 50), rect, 1)
+        # Draw grid from pre-rendered tiles
+        self.background.render(screen, self.offset_x, self.offset_y, scaled_grid_size, self.size)
 
         # Draw coordinate labels if zoomed out
         if self.zoom_level <= 0.4:
             font_size = 28 if self.zoom_level <= 0.2 else 22
-            font = pygame.font.Font(None, font_size)
             label_interval = 50 if self.zoom_level <= 0.2 else 10
 
             # Top edge (x labels)
             for x in range(start_x, end_x, label_interval):
-                label = font.render(str(x), True, (200, 200, 200))
+                label = render_text(str(x), font_size, (200, 200, 200))
                 px = x * scaled_grid_size + self.offset_x
                 screen.blit(label, (px + 2, 2))
             # Left edge (y labels)
             for y in range(start_y, end_y, label_interval):
-                label = font.render(str(y), True, (200, 200, 200))
+                label = render_text(str(y), font_size, (200, 200, 200))
                 py = y * scaled_grid_size + self.offset_y
                 screen.blit(label, (2, py + 2))
 
         # Draw move range tiles (only if visible)
-        for tile in self.move_tiles:
-            tx, ty = tile
-            if start_x <= tx < end_x and start_y <= ty < end_y:
-                rect = pygame.Rect(tx * scaled_grid_size + self.offset_x, ty * scaled_grid_size + self.offset_y, scaled_grid_size, scaled_grid_size)
-                pygame.draw.rect(screen, (100, 150, 255), rect)  # Solid blue highlight
-                pygame.draw.rect(screen, (0, 100, 255), rect, 3)  # Blue border
+        if self.move_tiles:
+            self.move_overlay.render(screen, self.move_tiles, scaled_grid_size, self.offset_x, self.offset_y)
         
+        # Far out, draw asteroids, planets and ships from the per-cell raster in one blit
+        lod = self.zoom_level < LOD_ZOOM_THRESHOLD
+        if lod:
+            self.lod.render(screen, start_x, start_y, end_x, end_y, scaled_grid_size, self.offset_x, self.offset_y)
+
         # Draw planets (only if visible)
-        for planet in self.planets:
+        visible_planets = self.planet_index.query(start_x, start_y, end_x, end_y)
+        for planet in visible_planets:
             px, py = planet.grid_position
             if (px + planet.size > start_x and px < end_x and
                 py + planet.size > start_y and py < end_y):
-                planet.render(screen, self.offset_x, self.offset_y, self.zoom_level)
+                if not lod:
+                    # Planets the current player's builders can reach get an outline
+                    highlight = current_player is not None and self.coverage.covered(current_player, planet)
+                    planet.render(screen, self.offset_x, self.offset_y, self.zoom_level, highlight)
+                elif planet.planet_type == 'SUN':
+                    # Only systems get labels at this distance
+                    label = render_text(f"{planet.system_label}-{planet.type_label}", 16, WHITE)
+                    screen.blit(label, (px * scaled_grid_size + self.offset_x + 2, (py + planet.size) * scaled_grid_size + self.offset_y + 2))
                 # Always show tooltip if selected or in build mode
                 if ((getattr(planet, 'selected', False) or self.build_mode) and hasattr(planet, 'render_tooltip')):
                     # Tooltip always to the right of the planet grid
@@ -675,30 +709,17 @@ class Galaxy:
                     tooltip_offset_x = (planet.grid_position[0] + planet.size) * scaled_grid_size + self.offset_x + 8
                     tooltip_offset_y = planet.grid_position[1] * scaled_grid_size + self.offset_y
                     planet.render_tooltip(screen, tooltip_offset_x, tooltip_offset_y)
-                # Draw grid overlay if selected and not a sun
-                if getattr(planet, 'selected', False) and getattr(planet, 'planet_type', None) != 'SUN':
-                    scaled_grid_size = round(GRID_SIZE * self.zoom_level)
-                    for gx in range(planet.size):
-                        for gy in range(planet.size):
-                            cell_x = (planet.grid_position[0] + gx) * scaled_grid_size + self.offset_x
-                            cell_y = (planet.grid_position[1] + gy) * scaled_grid_size + self.offset_y
-                            rect = pygame.Rect(cell_x, cell_y, scaled_grid_size, scaled_grid_size)
-                            pygame.draw.rect(screen, (0, 255, 0), rect, 2)
-                            # Draw building icon if present
-                            if planet.planet_grid[gy][gx] is not None:
-                                pygame.draw.rect(screen, (0, 120, 255), rect.inflate(-scaled_grid_size//3, -scaled_grid_size//3))
         
-        # Draw ships (only if visible)
-        for ship in self.ships:
-            sx, sy = ship.grid_position
-            if (start_x <= sx < end_x and start_y <= sy < end_y):
-                ship.render(screen, self.offset_x, self.offset_y, self.zoom_level)
-        
-        # Draw asteroids (only if visible)
-        for asteroid in self.asteroids:
-            ax, ay = asteroid['position']
-            if (start_x <= ax < end_x and start_y <= ay < end_y):
-                scaled_grid_size = round(GRID_SIZE * self.zoom_level)
+        if not lod:
+            # Draw ships (only if visible)
+            for ship in self.ship_index.query(start_x, start_y, end_x, end_y):
+                sx, sy = ship.grid_position
+                if (start_x <= sx < end_x and start_y <= sy < end_y):
+                    ship.render(screen, self.offset_x, self.offset_y, self.zoom_level)
+            
+            # Draw asteroids (only if visible)
+            asteroid_xs, asteroid_ys = self.asteroids.query(start_x, start_y, end_x, end_y)
+            for ax, ay in zip(asteroid_xs.tolist(), asteroid_ys.tolist()):
                 rect = pygame.Rect(ax * scaled_grid_size + self.offset_x, ay * scaled_grid_size + self.offset_y, scaled_grid_size, scaled_grid_size)
                 pygame.draw.rect(screen, (120, 120, 120), rect)  # Gray asteroids
                 pygame.draw.rect(screen, (80, 80, 80), rect, max(1, scaled_grid_size // 10))  # Darker border
@@ -707,23 +728,20 @@ class Galaxy:
         if self.selected_unit and hasattr(self.selected_unit, 'render_tooltip'):
             self.selected_unit.render_tooltip(screen, self.offset_x, self.offset_y)
 
-        # Draw debug markers for all suns
-        for planet in self.planets:
+        # Draw debug markers for all suns (markers can poke out past the visible cells)
+        radius = max(8, int(10 * self.zoom_level))
+        reach = radius // scaled_grid_size + 1
+        for planet in self.planet_index.query(start_x - reach, start_y - reach, end_x + reach, end_y + reach):
             if getattr(planet, 'planet_type', None) == 'SUN':
                 px, py = planet.grid_position
-                scaled_grid_size = round(GRID_SIZE * self.zoom_level)
                 cx = int(px * scaled_grid_size + self.offset_x + (planet.size * scaled_grid_size) // 2)
                 cy = int(py * scaled_grid_size + self.offset_y + (planet.size * scaled_grid_size) // 2)
-                pygame.draw.circle(screen, (255, 0, 0), (cx, cy), max(8, int(10 * self.zoom_level)))
+                pygame.draw.circle(screen, (255, 0, 0), (cx, cy), radius)
 
     def handle_right_click(self, pos):
         # Only deselect on right click
-        for s in self.ships:
-            s.set_selected(False)
-        for p in self.planets:
-            p.selected = False
+        self.clear_selection()
         self.build_mode = False  # Exit build mode on deselect
-        self.selected_unit = None
         self.build_warning = None
         print("Deselecting unit (right click).")
-        self.move_tiles = []
\ No newline at end of file
+        self.move_tiles = set()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import hashlib
+import os
+import zipfile
+import numpy as np
+from . import constants
+from .planet import Planet, Sun
+
+CACHE_VERSION = 2  # Bump when the generator or file layout changes
+GALAXY_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'galactic_conquest')
+
+# Generation settings that change what a seed produces
+_KEY_CONSTANTS = (
+    'SYSTEM_COUNT', 'SYSTEM_MIN_DISTANCE', 'SYSTEM_SPAWN_MARGIN', 'SUN_FOOTPRINT',
+    'PLANETS_PER_SYSTEM', 'PLANET_ORBIT', 'PLANET_SIZE', 'PLANET_PLACEMENT_ATTEMPTS',
+    'ASTEROID_PATCHES', 'ASTEROID_PATCH_SIZE', 'ASTEROID_PATCH_RADIUS', 'ASTEROID_PLANET_CLEARANCE',
+)
+
+
+def cache_path(seed, size=constants.GALAXY_SIZE, cache_dir=GALAXY_CACHE_DIR):
+    """File the galaxy for this seed, map size and generation settings lives in"""
+    settings = [(name, getattr(constants, name)) for name in _KEY_CONSTANTS]
+    key = hashlib.sha1(repr((CACHE_VERSION, seed, size, settings)).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"galaxy-{seed}-{key}.npz")
+
+
+def save_galaxy(galaxy, path):
+    """Write planets, suns and the asteroid bitmap to an uncompressed .npz"""
+    bodies = galaxy.planets
+    resources = [next(iter(body.resources.items()), ('', 0)) for body in bodies]
+    grid = galaxy.asteroids.grid
+    chunk_keys = list(grid.chunks)
+    arrays = {
+        'body_is_sun': np.array([isinstance(body, Sun) for body in bodies], dtype=bool),
+        'body_type': np.array([body.sun_type if isinstance(body, Sun) else body.planet_type for body in bodies], dtype='U16'),
+        'body_pos': np.array([body.grid_position for body in bodies], dtype=np.int32).reshape(-1, 2),
+        'body_size': np.array([body.size for body in bodies], dtype=np.int16),
+        'body_label': np.array([body.system_label for body in bodies], dtype='U8'),
+        'resource_name': np.array([name for name, _ in resources], dtype='U16'),
+        'resource_amount': np.array([amount for _, amount in resources], dtype=np.int32),
+        'asteroid_chunk_keys': np.array(chunk_keys, dtype=np.int64).reshape(-1, 2),
+        'asteroid_chunks': np.array([grid.chunks[key] for key in chunk_keys], dtype=np.uint8).reshape(-1, grid.chunk_size, grid.chunk_size // 8),
+        'asteroid_count': np.array(galaxy.asteroids.count, dtype=np.int64),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file first so an interrupted save never leaves a broken cache
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_galaxy(galaxy, path):
+    """Fill galaxy from a cache file; returns False if it is missing or unreadable"""
+    try:
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return False
+
+    galaxy.clear_planets()
+    rows = zip(arrays['body_is_sun'].tolist(), arrays['body_type'].tolist(), arrays['body_pos'].tolist(),
+               arrays['body_size'].tolist(), arrays['body_label'].tolist(),
+               arrays['resource_name'].tolist(), arrays['resource_amount'].tolist())
+    for is_sun, body_type, pos, size, label, resource_name, amount in rows:
+        resources = {resource_name: amount} if resource_name else {}
+        if is_sun:
+            body = Sun(body_type, tuple(pos), label, resources=resources)
+        else:
+            body = Planet(body_type, tuple(pos), size=size, system_label=label, resources=resources)
+        galaxy.add_planet(body)
+
+    galaxy.asteroids.clear()
+    grid = galaxy.asteroids.grid
+    for key, chunk in zip(arrays['asteroid_chunk_keys'].tolist(), arrays['asteroid_chunks']):
+        grid.chunks[tuple(key)] = chunk.copy()
+    galaxy.asteroids.count = int(arrays['asteroid_count'])
+    return True
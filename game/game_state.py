@@ -2,12 +2,13 @@ import pygame
 from .constants import *
 from .galaxy import Galaxy
 from .player import Player
+from .text_cache import render_text
 
 class GameState:
-    def __init__(self):
+    def __init__(self, seed=None, use_cache=True, size=GALAXY_SIZE, lazy=False, progress=None):
         self.current_player = 0
         self.players = [Player("Player 1"), Player("Player 2")]
-        self.galaxy = Galaxy()
+        self.galaxy = Galaxy(seed, use_cache=use_cache, size=size, lazy=lazy, progress=progress)
         self.current_turn = 1
         self.selected_building_type = None  # Track which building is selected for placement
         # UI buttons
@@ -16,6 +17,8 @@ class GameState:
         # Building menu button rects
         self.building_buttons = []
         self._init_building_buttons()
+        self.drag_start = None  # Screen position where a left-button press on the map began
+        self.drag_end = None
 
     def _init_building_buttons(self):
         # Place building buttons vertically on the right side
@@ -46,6 +49,8 @@ class GameState:
                 if self.debug_button.collidepoint(event.pos):
                     self.debug_add_resources()
                     return
+                if self.galaxy.minimap.handle_click(event.pos):
+                    return
                 # Building menu click
                 if self.galaxy.build_mode:  # Only show building menu when in build mode
                     available_buildings = self.get_available_buildings()
@@ -58,13 +63,26 @@ class GameState:
                                 print(f"DEBUG: Selected building type: {display_name}")
                                 return
                             y_offset += 52
-                self.handle_left_click(event.pos)
+                # Map clicks wait for the button to come up, in case this turns into a box select
+                self.drag_start = self.drag_end = event.pos
             elif event.button == 3:  # Right click
                 self.handle_right_click(event.pos)
             elif event.button == 4:  # Mouse wheel up
                 self.galaxy.handle_zoom(False)  # Zoom in
             elif event.button == 5:  # Mouse wheel down
                 self.galaxy.handle_zoom(True)   # Zoom out
+        elif event.type == pygame.MOUSEMOTION:
+            if self.drag_start:
+                self.drag_end = event.pos
+        elif event.type == pygame.MOUSEBUTTONUP:
+            if event.button == 1 and self.drag_start:
+                box = self.drag_box()
+                start = self.drag_start
+                self.drag_start = self.drag_end = None
+                if box:
+                    self.galaxy.select_ships_in_rect(box, self.current_player)
+                else:
+                    self.handle_left_click(start)
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_q:
                 # Deploy Carrier ability if selected
@@ -77,22 +95,27 @@ class GameState:
                         print(f"Carrier at {unit.grid_position} could not deploy units.")
                 # Dock Fighter/Bomber to nearest Carrier
                 elif unit and getattr(unit, 'label', None) in ('FIG', 'BOM'):
-                    carriers = [s for s in self.galaxy.ships if getattr(s, 'label', None) == 'CAR' and s.owner == unit.owner and s.can_dock(unit)]
-                    if not carriers:
+                    carrier = self.galaxy.nearest(unit.owner, 'CAR', unit.grid_position, where=lambda c: c.can_dock(unit))
+                    if carrier is None:
                         print("DEBUG: No available friendly Carrier to dock!")
                         return
-                    # Find nearest Carrier
-                    ux, uy = unit.grid_position
-                    carriers.sort(key=lambda c: abs(c.grid_position[0] - ux) + abs(c.grid_position[1] - uy))
-                    carrier = carriers[0]
                     carrier.dock_unit(unit)
                     print(f"DEBUG: {unit.label} docked with Carrier at {carrier.grid_position}")
-                    self.galaxy.ships.remove(unit)
+                    self.galaxy.remove_ship(unit)
                     unit.set_selected(False)
                     self.galaxy.selected_unit = None
-                    self.galaxy.move_tiles = []
+                    self.galaxy.move_tiles = set()
                     self.galaxy.build_mode = False
 
+    def drag_box(self):
+        """Screen rect of the current box select, or None while the drag is still just a click"""
+        if not self.drag_start:
+            return None
+        (x0, y0), (x1, y1) = self.drag_start, self.drag_end
+        if abs(x1 - x0) < DRAG_SELECT_MIN_PX and abs(y1 - y0) < DRAG_SELECT_MIN_PX:
+            return None
+        return pygame.Rect(min(x0, x1), min(y0, y1), abs(x1 - x0) + 1, abs(y1 - y0) + 1)
+
     def handle_left_click(self, pos):
         # Set the selected building type
         self.galaxy.selected_building_type = self.selected_building_type
@@ -152,42 +175,39 @@ class GameState:
         self.galaxy.update()
 
     def render(self, screen):
-        self.galaxy.render(screen)
+        self.galaxy.render(screen, self.current_player)
+        box = self.drag_box()
+        if box:
+            pygame.draw.rect(screen, SELECTION_BOX_COLOR, box, 1)
         self.render_ui(screen)
+        self.galaxy.minimap.render(screen)
         # Draw build warning if present
         if self.galaxy.build_warning:
-            font = pygame.font.Font(None, 32)
-            warning_text = font.render(self.galaxy.build_warning, True, (255, 60, 60))
+            warning_text = render_text(self.galaxy.build_warning, 32, (255, 60, 60))
             screen.blit(warning_text, (WINDOW_WIDTH // 2 - warning_text.get_width() // 2, 20))
         # Draw End Turn button
         pygame.draw.rect(screen, (60, 60, 60), self.end_turn_button)
-        font = pygame.font.Font(None, 32)
-        text = font.render("End Turn", True, WHITE)
+        text = render_text("End Turn", 32, WHITE)
         screen.blit(text, (self.end_turn_button.x + 20, self.end_turn_button.y + 10))
         # Draw Debug button
         pygame.draw.rect(screen, (100, 40, 40), self.debug_button)
-        debug_font = pygame.font.Font(None, 28)
-        debug_text = debug_font.render("+100 All (Debug)", True, WHITE)
+        debug_text = render_text("+100 All (Debug)", 28, WHITE)
         screen.blit(debug_text, (self.debug_button.x + 8, self.debug_button.y + 8))
         # Draw resources near End Turn button
         player = self.players[self.current_player]
-        res_font = pygame.font.Font(None, 24)
         res_y = self.end_turn_button.y - 28 * len(player.resources) - 10
         for resource, amount in player.resources.items():
-            res_text = res_font.render(f"{resource}: {amount}", True, WHITE)
+            res_text = render_text(f"{resource}: {amount}", 24, WHITE)
             screen.blit(res_text, (self.end_turn_button.x + 10, res_y))
             res_y += 28
         # Draw building selection menu if in build mode
         if self.galaxy.build_mode:
-            font = pygame.font.Font(None, 26)
-            cost_font = pygame.font.Font(None, 18)
             from .constants import BUILDING_COLORS, BUILDING_COSTS
             available_buildings = self.get_available_buildings()
             y_offset = 0
             
             # Show menu header
-            header_font = pygame.font.Font(None, 20)
-            header_text = header_font.render("Buildings", True, (255, 255, 255))
+            header_text = render_text("Buildings", 20, (255, 255, 255))
             screen.blit(header_text, (WINDOW_WIDTH - 175, 80))
             
             for display_name, rect in self.building_buttons:
@@ -219,7 +239,7 @@ class GameState:
                     pygame.draw.rect(screen, border_color, adjusted_rect, 3)
                     
                     # Draw building name
-                    label = font.render(display_name, True, (0, 0, 0))
+                    label = render_text(display_name, 26, (0, 0, 0))
                     screen.blit(label, (adjusted_rect.x + 10, adjusted_rect.y + 4))
                     
                     # Draw cost information below building name
@@ -233,7 +253,7 @@ class GameState:
                             else:
                                 cost_color = (180, 0, 0)  # Red if not affordable
                             
-                            cost_text = cost_font.render(f"{resource}: {amount}", True, cost_color)
+                            cost_text = render_text(f"{resource}: {amount}", 18, cost_color)
                             screen.blit(cost_text, (adjusted_rect.x + 12, cost_y))
                             cost_y += 16
                     
@@ -242,39 +262,32 @@ class GameState:
                     y_offset += 52
 
     def render_ui(self, screen):
-        font = pygame.font.Font(None, 36)
-        player_text = font.render(f"Player {self.current_player + 1}'s Turn", True, WHITE)
+        player_text = render_text(f"Player {self.current_player + 1}'s Turn", 36, WHITE)
         screen.blit(player_text, (10, 10))
-        turn_text = font.render(f"Turn: {self.current_turn}", True, WHITE)
+        turn_text = render_text(f"Turn: {self.current_turn}", 36, WHITE)
         screen.blit(turn_text, (10, 50))
         # Draw resources
-        res_font = pygame.font.Font(None, 28)
         player = self.players[self.current_player]
         res_y = 90
         for resource, amount in player.resources.items():
-            res_text = res_font.render(f"{resource}: {amount}", True, WHITE)
+            res_text = render_text(f"{resource}: {amount}", 28, WHITE)
             screen.blit(res_text, (10, res_y))
             res_y += 28
 
     def end_turn(self):
         # Add resource production from planets owned by the current player
         player = self.players[self.current_player]
-        for planet in self.galaxy.planets:
-            if hasattr(planet, 'owner') and planet.owner == self.current_player:
-                production = planet.get_resource_production()
-                for resource, amount in production.items():
-                    player.add_resource(resource, amount)
-                    print(f"Player {self.current_player} gained {amount} {resource} from {planet.system_label}-{planet.type_label}")
-        
+        income = self.galaxy.production.income(self.current_player)
+        for resource, amount in income.items():
+            player.add_resource(resource, amount)
+        if income:
+            print(f"Player {self.current_player} gained {income} from {self.galaxy.production.planet_count(self.current_player)} planets")
 
-        
         self.current_player = (self.current_player + 1) % len(self.players)
         if self.current_player == 0:
             self.current_turn += 1
         self.galaxy.reset_all_ship_actions()
-        if self.galaxy.selected_unit:
-            self.galaxy.selected_unit.set_selected(False)
-            self.galaxy.selected_unit = None
+        self.galaxy.clear_selection()
 
     def debug_add_resources(self):
         player = self.players[self.current_player]
@@ -0,0 +1,223 @@
+import numpy as np
+
+CHUNK_SIZE = 64  # Cells per side of each grid chunk
+
+
+def pack_cells(xs, ys):
+    """Pack integer (x, y) arrays into single int64 keys for fast unique/compare"""
+    return (np.asarray(xs, dtype=np.int64) << 32) | (np.asarray(ys, dtype=np.int64) & 0xFFFFFFFF)
+
+
+def unpack_cell(key):
+    key = int(key)
+    return key >> 32, ((key & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+
+
+class ChunkedGrid:
+    """Sparse 2D grid of galaxy cells stored as NumPy chunks.
+
+    Chunks are allocated on first write, so memory follows where things
+    actually are instead of the size of the map. Chunk arrays are indexed
+    [x, y] like pygame.surfarray.
+    """
+    def __init__(self, dtype=np.int32, fill=0, chunk_size=CHUNK_SIZE):
+        self.dtype = np.dtype(dtype)
+        self.fill = fill
+        self.chunk_size = chunk_size
+        self.chunks = {}  # (chunk_x, chunk_y) -> ndarray
+
+    def clear(self):
+        self.chunks.clear()
+
+    def _new_chunk(self, key):
+        chunk = np.full((self.chunk_size, self.chunk_size), self.fill, dtype=self.dtype)
+        self.chunks[key] = chunk
+        return chunk
+
+    def get(self, x, y):
+        cs = self.chunk_size
+        chunk = self.chunks.get((x // cs, y // cs))
+        if chunk is None:
+            return self.fill
+        return chunk[x % cs, y % cs].item()
+
+    def set(self, x, y, value):
+        cs = self.chunk_size
+        key = (x // cs, y // cs)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if value == self.fill:
+                return
+            chunk = self._new_chunk(key)
+        chunk[x % cs, y % cs] = value
+
+    def _group_by_chunk(self, xs, ys):
+        # Yield (key, index) for the cells of each chunk touched by xs/ys
+        cs = self.chunk_size
+        keys = pack_cells(xs // cs, ys // cs)
+        first = keys[0]
+        if (keys == first).all():
+            # Common case: the whole batch sits in one chunk
+            yield unpack_cell(first), slice(None)
+            return
+        for key in np.unique(keys):
+            yield unpack_cell(key), np.flatnonzero(keys == key)
+
+    def get_many(self, xs, ys):
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        out = np.full(xs.shape, self.fill, dtype=self.dtype)
+        if xs.size == 0:
+            return out
+        cs = self.chunk_size
+        for key, idx in self._group_by_chunk(xs, ys):
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                out[idx] = chunk[xs[idx] % cs, ys[idx] % cs]
+        return out
+
+    def set_many(self, xs, ys, value):
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if xs.size == 0:
+            return
+        cs = self.chunk_size
+        for key, idx in self._group_by_chunk(xs, ys):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                if value == self.fill:
+                    continue
+                chunk = self._new_chunk(key)
+            chunk[xs[idx] % cs, ys[idx] % cs] = value
+
+    def _chunk_slices(self, x, y, w, h):
+        # Yield (key, chunk slice, window slice) for every chunk overlapping the rect
+        cs = self.chunk_size
+        for cx in range(x // cs, (x + w - 1) // cs + 1):
+            x0 = max(x, cx * cs)
+            x1 = min(x + w, (cx + 1) * cs)
+            for cy in range(y // cs, (y + h - 1) // cs + 1):
+                y0 = max(y, cy * cs)
+                y1 = min(y + h, (cy + 1) * cs)
+                yield ((cx, cy),
+                       (slice(x0 - cx * cs, x1 - cx * cs), slice(y0 - cy * cs, y1 - cy * cs)),
+                       (slice(x0 - x, x1 - x), slice(y0 - y, y1 - y)))
+
+    def fill_rect(self, x, y, w, h, value):
+        if w <= 0 or h <= 0:
+            return
+        for key, chunk_slice, _ in self._chunk_slices(x, y, w, h):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                if value == self.fill:
+                    continue
+                chunk = self._new_chunk(key)
+            chunk[chunk_slice] = value
+
+    def window(self, x, y, w, h):
+        """Return a dense (w, h) copy of the cells in the given rect"""
+        out = np.full((max(0, w), max(0, h)), self.fill, dtype=self.dtype)
+        if w <= 0 or h <= 0:
+            return out
+        for key, chunk_slice, window_slice in self._chunk_slices(x, y, w, h):
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                out[window_slice] = chunk[chunk_slice]
+        return out
+
+    def drop_chunks(self, x0, y0, x1, y1, empty_only=False):
+        """Free every chunk that lies entirely inside the rect, or only those holding nothing if empty_only"""
+        cs = self.chunk_size
+        for cx in range(-(-x0 // cs), x1 // cs):
+            for cy in range(-(-y0 // cs), y1 // cs):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is not None and not (empty_only and (chunk != self.fill).any()):
+                    del self.chunks[(cx, cy)]
+
+    @property
+    def nbytes(self):
+        return sum(chunk.nbytes for chunk in self.chunks.values())
+
+
+class ChunkedBitGrid(ChunkedGrid):
+    """ChunkedGrid of booleans packed eight cells to a byte along y"""
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        super().__init__(np.bool_, False, chunk_size)
+
+    def _new_chunk(self, key):
+        chunk = np.zeros((self.chunk_size, self.chunk_size // 8), dtype=np.uint8)
+        self.chunks[key] = chunk
+        return chunk
+
+    def get(self, x, y):
+        cs = self.chunk_size
+        chunk = self.chunks.get((x // cs, y // cs))
+        if chunk is None:
+            return False
+        ly = y % cs
+        return bool((chunk[x % cs, ly >> 3] >> (ly & 7)) & 1)
+
+    def set(self, x, y, value):
+        cs = self.chunk_size
+        key = (x // cs, y // cs)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if not value:
+                return
+            chunk = self._new_chunk(key)
+        ly = y % cs
+        if value:
+            chunk[x % cs, ly >> 3] |= np.uint8(1 << (ly & 7))
+        else:
+            chunk[x % cs, ly >> 3] &= np.uint8(~(1 << (ly & 7)) & 0xFF)
+
+    def get_many(self, xs, ys):
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        out = np.zeros(xs.shape, dtype=bool)
+        if xs.size == 0:
+            return out
+        cs = self.chunk_size
+        for key, idx in self._group_by_chunk(xs, ys):
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                ly = ys[idx] % cs
+                out[idx] = (chunk[xs[idx] % cs, ly >> 3] >> (ly & 7)) & 1
+        return out
+
+    def set_many(self, xs, ys, value):
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if xs.size == 0:
+            return
+        cs = self.chunk_size
+        for key, idx in self._group_by_chunk(xs, ys):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                if not value:
+                    continue
+                chunk = self._new_chunk(key)
+            ly = ys[idx] % cs
+            bits = (1 << (ly & 7)).astype(np.uint8)
+            if value:
+                np.bitwise_or.at(chunk, (xs[idx] % cs, ly >> 3), bits)
+            else:
+                np.bitwise_and.at(chunk, (xs[idx] % cs, ly >> 3), ~bits)
+
+    def fill_rect(self, x, y, w, h, value):
+        xs, ys = np.meshgrid(np.arange(x, x + w), np.arange(y, y + h), indexing='ij')
+        self.set_many(xs.ravel(), ys.ravel(), value)
+
+    def window(self, x, y, w, h):
+        out = np.zeros((max(0, w), max(0, h)), dtype=bool)
+        if w <= 0 or h <= 0:
+            return out
+        for key, chunk_slice, window_slice in self._chunk_slices(x, y, w, h):
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                out[window_slice] = np.unpackbits(chunk, axis=1, bitorder='little').view(bool)[chunk_slice]
+        return out
+
+    def unpack(self, key):
+        """Return the chunk at key as a (chunk_size, chunk_size) bool array"""
+        return np.unpackbits(self.chunks[key], axis=1, bitorder='little').view(bool)
@@ -0,0 +1,66 @@
+import threading
+import time
+import pygame
+from .constants import *
+from .game_state import GameState
+from .text_cache import render_text
+
+
+class GameLoader:
+    """Builds the GameState on a background thread.
+
+    Generation only touches NumPy and plain Python objects, so the main
+    thread is free to keep pumping pygame events and drawing the loading
+    screen. Progress is reported per stage as (done, total).
+    """
+    def __init__(self, **game_args):
+        self.stages = {}  # stage name -> (done, total), in the order they started
+        self.game_state = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self.thread = threading.Thread(target=self._run, kwargs=game_args, daemon=True)
+        self.thread.start()
+
+    def _run(self, **game_args):
+        try:
+            self.game_state = GameState(progress=self.report, **game_args)
+        except Exception as error:
+            self.error = error
+        self.finished = time.perf_counter()
+
+    def report(self, stage, done, total):
+        self.stages[stage] = (done, total)
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    def result(self):
+        """Return the finished GameState, re-raising anything generation threw"""
+        if self.error is not None:
+            raise self.error
+        return self.game_state
+
+
+def render_loading_screen(screen, loader):
+    screen.fill(BLACK)
+    title = render_text("Generating galaxy...", 48, WHITE)
+    screen.blit(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, WINDOW_HEIGHT // 2 - 120))
+
+    # One bar per stage; stages appear as generation reaches them
+    bar_width = 400
+    x = WINDOW_WIDTH // 2 - bar_width // 2
+    y = WINDOW_HEIGHT // 2 - 50
+    for stage, (done, total) in list(loader.stages.items()):
+        label = render_text(f"{stage.capitalize()}: {done}/{total}", 28, WHITE)
+        screen.blit(label, (x, y))
+        bar = pygame.Rect(x, y + 24, bar_width, 16)
+        pygame.draw.rect(screen, GRAY, bar, 1)
+        if total:
+            pygame.draw.rect(screen, BLUE, (bar.x + 1, bar.y + 1, (bar.width - 2) * done // total, bar.height - 2))
+        y += 60
+
+    elapsed = time.perf_counter() - loader.started
+    timer = render_text(f"{elapsed:.1f} s", 28, GRAY)
+    screen.blit(timer, (WINDOW_WIDTH // 2 - timer.get_width() // 2, y + 10))
@@ -0,0 +1,104 @@
+import numpy as np
+import pygame
+from .constants import *
+from .grid import ChunkedGrid
+
+# 32-bit surfaces laid out so a 0xRRGGBB integer is exactly one pixel
+RASTER_MASKS = (0xFF0000, 0x00FF00, 0x0000FF, 0)
+
+
+def pack_color(color):
+    r, g, b = color[:3]
+    return (r << 16) | (g << 8) | b
+
+
+class LodRaster:
+    """One pixel per galaxy cell, used to draw the map when zoomed far out.
+
+    Asteroids, planets/suns and ships are rasterized chunk by chunk from
+    the occupancy grids and the asteroid bitmap. Galaxy marks the cells
+    it changes as dirty, and only dirty chunks that come into view are
+    rebuilt, so the raster is never regenerated wholesale per frame.
+    """
+    def __init__(self, galaxy):
+        self.galaxy = galaxy
+        self.raster = ChunkedGrid(np.uint32)  # Packed 0xRRGGBB per cell, 0 = empty
+        self.built = set()  # Chunk keys whose raster is up to date
+        self.version = 0  # Bumped whenever a visible chunk is rebuilt
+        self.rebuilt = 0  # Chunks rebuilt so far
+        self._view_key = None
+        self._view = None
+
+    def invalidate(self):
+        self.built.clear()
+        self.raster.clear()
+
+    def mark_rect(self, x, y, w, h):
+        """Mark the chunks overlapping the given cells as out of date.
+
+        Their pixels are freed too, since they are rebuilt before they are
+        drawn again; that way evicted sectors don't keep raster memory.
+        """
+        cs = self.raster.chunk_size
+        for cx in range(x // cs, (x + w - 1) // cs + 1):
+            for cy in range(y // cs, (y + h - 1) // cs + 1):
+                self.built.discard((cx, cy))
+                self.raster.chunks.pop((cx, cy), None)
+
+    def mark_cell(self, pos):
+        self.mark_rect(pos[0], pos[1], 1, 1)
+
+    def _colors(self, ids, objects):
+        # Map a window of object ids to packed colors
+        out = np.zeros(ids.shape, dtype=np.uint32)
+        present = np.unique(ids[ids != 0])
+        if present.size:
+            lut = np.array([pack_color(objects[oid].get_color()) for oid in present.tolist()], dtype=np.uint32)
+            hit = ids != 0
+            out[hit] = lut[np.searchsorted(present, ids[hit])]
+        return out
+
+    def _build(self, key):
+        galaxy = self.galaxy
+        cs = self.raster.chunk_size
+        x, y = key[0] * cs, key[1] * cs
+        objects = galaxy.occupancy.objects
+        chunk = np.where(galaxy.asteroids.grid.window(x, y, cs, cs), np.uint32(pack_color(LOD_ASTEROID_COLOR)), np.uint32(0))
+        bodies = self._colors(galaxy.occupancy.body_cells.window(x, y, cs, cs), objects)
+        chunk = np.where(bodies != 0, bodies, chunk)
+        ships = self._colors(galaxy.occupancy.ship_cells.window(x, y, cs, cs), objects)
+        chunk = np.where(ships != 0, ships, chunk)
+        if chunk.any():
+            self.raster.chunks[key] = chunk
+        else:
+            self.raster.chunks.pop(key, None)
+        self.built.add(key)
+        self.rebuilt += 1
+
+    def refresh(self, x0, y0, x1, y1):
+        """Rebuild the out-of-date chunks overlapping the given cells"""
+        cs = self.raster.chunk_size
+        for cx in range(x0 // cs, (x1 - 1) // cs + 1):
+            for cy in range(y0 // cs, (y1 - 1) // cs + 1):
+                if (cx, cy) not in self.built:
+                    self._build((cx, cy))
+                    self.version += 1
+
+    def render(self, screen, start_x, start_y, end_x, end_y, cell_px, offset_x, offset_y):
+        if end_x <= start_x or end_y <= start_y:
+            return
+        # Work on whole chunks, so small pans reuse the same scaled surface
+        cs = self.raster.chunk_size
+        x0, y0 = start_x // cs * cs, start_y // cs * cs
+        x1, y1 = -(-end_x // cs) * cs, -(-end_y // cs) * cs
+        self.refresh(x0, y0, x1, y1)
+        key = (x0, y0, x1, y1, cell_px, self.version)
+        if key != self._view_key:
+            # One small surface at a pixel per cell, scaled up in a single step
+            w, h = x1 - x0, y1 - y0
+            surface = pygame.Surface((w, h), 0, 32, RASTER_MASKS)
+            pygame.surfarray.blit_array(surface, self.raster.window(x0, y0, w, h))
+            self._view = pygame.transform.scale(surface, (w * cell_px, h * cell_px))
+            self._view.set_colorkey((0, 0, 0), pygame.RLEACCEL)  # Empty cells let the grid show through
+            self._view_key = key
+        screen.blit(self._view, (x0 * cell_px + offset_x, y0 * cell_px + offset_y))
@@ -0,0 +1,126 @@
+import numpy as np
+import pygame
+from .constants import *
+from .lod import RASTER_MASKS, pack_color
+
+# What wins when several things share a minimap pixel (higher wins)
+ASTEROID, PLANET, OWNED_PLANET, SUN, SHIP = 1, 2, 3, 4, 5
+
+
+def _key(priority, color):
+    return (priority << 24) | pack_color(color)
+
+
+class Minimap:
+    """Downsampled overview of the whole galaxy in a corner of the screen.
+
+    Each pixel covers a scale x scale block of cells and shows the most
+    important thing in it: a ship, a sun, an owned planet, a planet, then
+    asteroids. The image is built once; Galaxy marks the cells it changes
+    and only those pixels are recomputed before the next draw.
+    """
+    def __init__(self, galaxy, size=MINIMAP_SIZE):
+        self.galaxy = galaxy
+        self.scale = -(-galaxy.size // size)  # Cells per pixel
+        self.width = -(-galaxy.size // self.scale)
+        self.rect = pygame.Rect(MINIMAP_MARGIN, WINDOW_HEIGHT - MINIMAP_MARGIN - self.width, self.width, self.width)
+        self.pixels = np.zeros((self.width, self.width), dtype=np.uint32)  # Packed 0xRRGGBB, 0 = empty
+        self.surface = pygame.Surface((self.width, self.width), 0, 32, RASTER_MASKS)
+        self.dirty = set()  # Tile keys waiting to be recomputed
+        self.invalidate()
+
+    def invalidate(self):
+        tiles = -(-self.width // MINIMAP_TILE)
+        self.dirty.update((tx, ty) for tx in range(tiles) for ty in range(tiles))
+
+    def mark_rect(self, x, y, w, h):
+        """Mark the pixels covering the given cells as out of date"""
+        span = self.scale * MINIMAP_TILE
+        for tx in range(max(0, x) // span, max(0, x + w - 1) // span + 1):
+            for ty in range(max(0, y) // span, max(0, y + h - 1) // span + 1):
+                self.dirty.add((tx, ty))
+
+    def mark_cell(self, pos):
+        self.mark_rect(pos[0], pos[1], 1, 1)
+
+    def _object_key(self, obj):
+        if obj.unit_type == 'SHIP':
+            return _key(SHIP, PLAYER_COLORS[obj.owner])
+        if getattr(obj, 'planet_type', None) == 'SUN':
+            return _key(SUN, obj.get_color())
+        if getattr(obj, 'owner', None) is not None:
+            return _key(OWNED_PLANET, PLAYER_COLORS[obj.owner])
+        return _key(PLANET, obj.get_color())
+
+    def _layer_keys(self, ids):
+        # Per-cell priority keys for a window of occupancy ids
+        out = np.zeros(ids.shape, dtype=np.int64)
+        present = np.unique(ids[ids != 0])
+        if present.size:
+            objects = self.galaxy.occupancy.objects
+            lut = np.array([self._object_key(objects[oid]) for oid in present.tolist()], dtype=np.int64)
+            hit = ids != 0
+            out[hit] = lut[np.searchsorted(present, ids[hit])]
+        return out
+
+    def _has_chunks(self, x0, y0, x1, y1):
+        grids = (self.galaxy.asteroids.grid, self.galaxy.occupancy.body_cells, self.galaxy.occupancy.ship_cells)
+        cs = grids[0].chunk_size
+        for cx in range(x0 // cs, (x1 - 1) // cs + 1):
+            for cy in range(y0 // cs, (y1 - 1) // cs + 1):
+                if any((cx, cy) in grid.chunks for grid in grids):
+                    return True
+        return False
+
+    def _recompute(self, tile):
+        px0, py0 = tile[0] * MINIMAP_TILE, tile[1] * MINIMAP_TILE
+        pw, ph = min(MINIMAP_TILE, self.width - px0), min(MINIMAP_TILE, self.width - py0)
+        if pw <= 0 or ph <= 0:
+            return
+        s = self.scale
+        x0, y0, w, h = px0 * s, py0 * s, pw * s, ph * s
+        if not self._has_chunks(x0, y0, x0 + w, y0 + h):
+            self.pixels[px0:px0 + pw, py0:py0 + ph] = 0
+            return
+        occupancy = self.galaxy.occupancy
+        keys = np.where(self.galaxy.asteroids.grid.window(x0, y0, w, h), _key(ASTEROID, MINIMAP_ASTEROID_COLOR), 0)
+        keys = np.maximum(keys, self._layer_keys(occupancy.body_cells.window(x0, y0, w, h)))
+        keys = np.maximum(keys, self._layer_keys(occupancy.ship_cells.window(x0, y0, w, h)))
+        block = keys.reshape(pw, s, ph, s).max(axis=(1, 3))
+        self.pixels[px0:px0 + pw, py0:py0 + ph] = block & 0xFFFFFF
+
+    def refresh(self):
+        if not self.dirty:
+            return
+        for tile in self.dirty:
+            self._recompute(tile)
+        self.dirty.clear()
+        self.surface.fill(MINIMAP_BACKGROUND)
+        overlay = pygame.Surface(self.surface.get_size(), 0, 32, RASTER_MASKS)
+        pygame.surfarray.blit_array(overlay, self.pixels)
+        overlay.set_colorkey((0, 0, 0))
+        self.surface.blit(overlay, (0, 0))
+
+    def render(self, screen):
+        self.refresh()
+        screen.blit(self.surface, self.rect)
+        pygame.draw.rect(screen, GRAY, self.rect, 1)
+        # Outline the part of the galaxy that is on screen
+        galaxy = self.galaxy
+        cell_px = round(GRID_SIZE * galaxy.zoom_level)
+        view = pygame.Rect(self.rect.x + (-galaxy.offset_x / cell_px) / self.scale,
+                           self.rect.y + (-galaxy.offset_y / cell_px) / self.scale,
+                           max(2, WINDOW_WIDTH / cell_px / self.scale),
+                           max(2, WINDOW_HEIGHT / cell_px / self.scale))
+        view = view.clip(self.rect)
+        if view.width and view.height:
+            pygame.draw.rect(screen, WHITE, view, 1)
+
+    def handle_click(self, pos):
+        """Center the view on the clicked spot; returns False if pos is outside the minimap"""
+        if not self.rect.collidepoint(pos):
+            return False
+        x = (pos[0] - self.rect.x + 0.5) * self.scale
+        y = (pos[1] - self.rect.y + 0.5) * self.scale
+        self.galaxy.center_on((x, y))
+        return True
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+import pygame
+from .constants import *
+
+
+class MoveTiles(frozenset):
+    """Cells a ship can move to, with the origin and range they came from"""
+    def __new__(cls, origin, move_range, cells):
+        return super().__new__(cls, cells)
+
+    def __init__(self, origin, move_range, cells):
+        self.origin = origin
+        self.move_range = move_range
+
+
+class MoveOverlay:
+    """Move range highlight baked into one surface per tile set and cell size.
+
+    The highlight only changes when a ship is selected, moves or the zoom
+    changes, so it is drawn once and blitted as a whole instead of
+    drawing every tile each frame.
+    """
+    def __init__(self, max_surfaces=MOVE_OVERLAY_CACHE):
+        self.max_surfaces = max_surfaces
+        self.surfaces = OrderedDict()  # (origin, range, tiles, cell_px) -> Surface, least recently used first
+
+    def surface(self, tiles, cell_px):
+        # MoveTiles compare as plain sets, so the origin and range have to be part of the key
+        key = (tiles.origin, tiles.move_range, tiles, cell_px)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        x, y = tiles.origin
+        r = tiles.move_range
+        side = (2 * r + 1) * cell_px
+        surface = pygame.Surface((side, side))
+        surface.fill(BLACK)
+        surface.set_colorkey(BLACK)
+        for tx, ty in tiles:
+            rect = pygame.Rect((tx - x + r) * cell_px, (ty - y + r) * cell_px, cell_px, cell_px)
+            pygame.draw.rect(surface, MOVE_TILE_COLOR, rect)  # Solid blue highlight
+            pygame.draw.rect(surface, MOVE_TILE_BORDER, rect, 3)  # Blue border
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def render(self, screen, tiles, cell_px, offset_x, offset_y):
+        x, y = tiles.origin
+        r = tiles.move_range
+        screen.blit(self.surface(tiles, cell_px), ((x - r) * cell_px + offset_x, (y - r) * cell_px + offset_y))
@@ -0,0 +1,87 @@
+import numpy as np
+from .grid import ChunkedGrid
+
+
+class OccupancyIndex:
+    """Cell -> object index for everything that blocks a galaxy cell.
+
+    Ships and planets/suns are kept on separate integer-ID layers so point
+    lookups are O(1) and a ship can be found even when it sits next to a
+    planet. ID 0 means the cell is empty.
+    """
+    def __init__(self):
+        self.ship_cells = ChunkedGrid(np.int32)
+        self.body_cells = ChunkedGrid(np.int32)
+        self.objects = {}  # int id -> object
+        self._ids = {}  # id(object) -> int id
+        self._next_id = 1
+
+    def _register(self, obj):
+        key = id(obj)
+        oid = self._ids.get(key)
+        if oid is None:
+            oid = self._next_id
+            self._next_id += 1
+            self._ids[key] = oid
+            self.objects[oid] = obj
+        return oid
+
+    def _release(self, obj):
+        oid = self._ids.pop(id(obj), None)
+        if oid is not None:
+            del self.objects[oid]
+        return oid
+
+    def clear_ships(self):
+        for oid in [oid for oid, obj in self.objects.items() if obj.unit_type == 'SHIP']:
+            del self._ids[id(self.objects.pop(oid))]
+        self.ship_cells.clear()
+
+    def clear_bodies(self):
+        for oid in [oid for oid, obj in self.objects.items() if obj.unit_type != 'SHIP']:
+            del self._ids[id(self.objects.pop(oid))]
+        self.body_cells.clear()
+
+    # Ships occupy a single cell
+    def add_ship(self, ship):
+        x, y = ship.grid_position
+        self.ship_cells.set(x, y, self._register(ship))
+
+    def remove_ship(self, ship):
+        oid = self._release(ship)
+        x, y = ship.grid_position
+        if oid is not None and self.ship_cells.get(x, y) == oid:
+            self.ship_cells.set(x, y, 0)
+
+    def move_ship(self, ship, new_pos):
+        """Move ship to new_pos, keeping the index in sync"""
+        oid = self._register(ship)
+        x, y = ship.grid_position
+        if self.ship_cells.get(x, y) == oid:
+            self.ship_cells.set(x, y, 0)
+        ship.grid_position = new_pos
+        self.ship_cells.set(new_pos[0], new_pos[1], oid)
+
+    # Planets and suns cover a size x size block
+    def add_body(self, body):
+        x, y = body.grid_position
+        self.body_cells.fill_rect(x, y, body.size, body.size, self._register(body))
+
+    def remove_body(self, body):
+        if self._release(body) is not None:
+            x, y = body.grid_position
+            self.body_cells.fill_rect(x, y, body.size, body.size, 0)
+
+    def ship_at(self, pos):
+        return self.objects.get(self.ship_cells.get(pos[0], pos[1]))
+
+    def body_at(self, pos):
+        return self.objects.get(self.body_cells.get(pos[0], pos[1]))
+
+    def is_blocked(self, pos):
+        x, y = pos
+        return self.ship_cells.get(x, y) != 0 or self.body_cells.get(x, y) != 0
+
+    def area_clear(self, x, y, size):
+        """True if a size x size block at (x, y) keeps a 1-cell gap from every planet/sun"""
+        return not self.body_cells.window(x - 1, y - 1, size + 2, size + 2).any()
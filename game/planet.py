@@ -2,6 +2,8 @@ import pygame
 import numpy as np
 from .unit import Unit
 from .constants import *
+from .text_cache import render_text
+from .sprites import planet_surfaces, bake
 
 PLANET_TYPES = {
     'ROCKY': {'label': 'R', 'color': (139, 69, 19)},
@@ -22,70 +24,152 @@ SUN_TYPES = {
     'NEUTRON_STAR': {'label': 'NS', 'color': (180, 180, 255), 'size': 2},
 }
 
+# Building types are stored on planet grids as small ints; 0 is an empty cell
+BUILDING_TYPE_NAMES = [None] + list(BUILDING_TYPES.values())
+BUILDING_TYPE_IDS = {name: i for i, name in enumerate(BUILDING_TYPE_NAMES) if name is not None}
+
+
+def building_type_id(name):
+    type_id = BUILDING_TYPE_IDS.get(name)
+    if type_id is None:
+        type_id = BUILDING_TYPE_IDS[name] = len(BUILDING_TYPE_NAMES)
+        BUILDING_TYPE_NAMES.append(name)
+    return type_id
+
+
 class Planet(Unit):
-    def __init__(self, planet_type, grid_position, size=3, system_label=None):
+    def __init__(self, planet_type, grid_position, size=3, system_label=None, rng=None, resources=None):
         super().__init__('PLANET', grid_position, size=size)
         self.planet_type = planet_type
-        self.resources = self._generate_resources()
+        if resources is None:
+            resources = self._generate_resources(rng or np.random.default_rng())
+        self.resources = resources
+        self.production = dict(resources)  # Base resources plus building output, kept up to date by place_building
         self.show_tooltip = False
         self.color = PLANET_TYPES.get(planet_type, {'color': (255, 255, 255)})['color']
         self.type_label = PLANET_TYPES.get(planet_type, {'label': '?'})['label']
         self.system_label = system_label
-        self.planet_grid = [[None for _ in range(self.size)] for _ in range(self.size)]  # NxN grid
+        # NxN building grid indexed [y, x]: building type id, and owning player or -1 where empty
+        self.planet_grid = np.zeros((self.size, self.size), dtype=np.uint8)
+        self.grid_owner = np.full((self.size, self.size), -1, dtype=np.int16)
 
-    def _generate_resources(self):
+    def _generate_resources(self, rng):
         # Generate random resources based on planet type
-        resources = {
-            'ROCK': {'minerals': np.random.randint(50, 100)},
-            'GAS': {'gas': np.random.randint(50, 100)},
-            'ICE': {'water': np.random.randint(50, 100)},
-            'SUN': {'energy': np.random.randint(50, 100)}
+        resource_names = {
+            'ROCK': 'minerals',
+            'GAS': 'gas',
+            'ICE': 'water',
+            'SUN': 'energy'
         }
-        return resources.get(self.planet_type, {})
+        if self.planet_type not in resource_names:
+            return {}
+        return {resource_names[self.planet_type]: int(rng.integers(50, 100))}
 
     def get_color(self):
         return self.color
 
-    def render(self, screen, offset_x, offset_y, zoom_level=1.0):
+    # Bumped whenever the planet's look changes (buildings, owner), so cached surfaces are redrawn
+    version = 0
+    _surface = None
+    _surface_key = None
+
+    @property
+    def owner(self):
+        return self._owner
+
+    @owner.setter
+    def owner(self, value):
+        self._owner = value
+        self.version += 1
+
+    def render(self, screen, offset_x, offset_y, zoom_level=1.0, highlight=False):
         scaled_grid_size = round(GRID_SIZE * zoom_level)
-        scaled_size = max(10, int(self.size * scaled_grid_size))
         px = self.grid_position[0] * scaled_grid_size + offset_x
         py = self.grid_position[1] * scaled_grid_size + offset_y
-        rect = pygame.Rect(px, py, scaled_size, scaled_size)
+        screen.blit(self.cached_surface(scaled_grid_size, highlight), (px, py))
+
+    def cached_surface(self, scaled_grid_size, highlight=False):
+        key = (scaled_grid_size, self.version, self.selected, highlight)
+        if self._surface_key != key:
+            self._surface = bake(self.bake_surface(scaled_grid_size, highlight))
+            self._surface_key = key
+            planet_surfaces.add(self, self._surface, self.drop_cached_surface)
+        else:
+            planet_surfaces.touch(self)
+        return self._surface
+
+    def drop_cached_surface(self):
+        self._surface = None
+        self._surface_key = None
+
+    def _label_surface(self, scaled_size, width, height):
+        # Transparent surface big enough for the body and a label that may stick out of it
+        label_text = None
+        if self.system_label:
+            label_text = render_text(f"{self.system_label}-{self.type_label}", max(14, scaled_size // 2), (255, 255, 255))
+            width = max(width, label_text.get_width() + 2)
+            height = max(height, label_text.get_height() + 2)
+        return pygame.Surface((width, height), pygame.SRCALPHA), label_text
+
+    def bake_surface(self, scaled_grid_size, highlight=False):
+        """Draw the planet, its buildings and label (plus the selection grid and build outline) at one zoom"""
+        scaled_size = max(10, int(self.size * scaled_grid_size))
+        surface, label_text = self._label_surface(scaled_size, scaled_size, scaled_size)
+        rect = pygame.Rect(0, 0, scaled_size, scaled_size)
         # Draw main square
-        pygame.draw.rect(screen, self.color, rect)
+        pygame.draw.rect(surface, self.color, rect)
         # Draw darker border for all planets
         border_color = tuple(max(0, c - 60) for c in self.color)
-        pygame.draw.rect(screen, border_color, rect, max(2, scaled_size // 10))
+        pygame.draw.rect(surface, border_color, rect, max(2, scaled_size // 10))
         # Draw buildings on the grid (colored by type, always visible)
         from .constants import BUILDING_COLORS
-        for gy in range(self.size):
-            for gx in range(self.size):
-                cell = self.planet_grid[gy][gx]
-                if cell is not None:
-                    btype = cell.get('type', None)
-                    color = BUILDING_COLORS.get(btype, (0, 120, 255))
-                    cell_x = (self.grid_position[0] + gx) * scaled_grid_size + offset_x
-                    cell_y = (self.grid_position[1] + gy) * scaled_grid_size + offset_y
-                    rect = pygame.Rect(cell_x, cell_y, scaled_grid_size, scaled_grid_size)
-                    pygame.draw.rect(screen, color, rect.inflate(-scaled_grid_size//3, -scaled_grid_size//3))
+        gys, gxs = np.nonzero(self.planet_grid)
+        for gy, gx, type_id in zip(gys.tolist(), gxs.tolist(), self.planet_grid[gys, gxs].tolist()):
+            color = BUILDING_COLORS.get(BUILDING_TYPE_NAMES[type_id], (0, 120, 255))
+            rect = pygame.Rect(gx * scaled_grid_size, gy * scaled_grid_size, scaled_grid_size, scaled_grid_size)
+            pygame.draw.rect(surface, color, rect.inflate(-scaled_grid_size//3, -scaled_grid_size//3))
         # Draw label always on top of buildings
-        if self.system_label:
-            font = pygame.font.Font(None, max(14, scaled_size // 2))
-            label_text = font.render(f"{self.system_label}-{self.type_label}", True, (255, 255, 255))
-            screen.blit(label_text, (px + 2, py + 2))
+        if label_text is not None:
+            surface.blit(label_text, (2, 2))
+        # Draw grid overlay if selected
+        if self.selected:
+            # Every cell's 2px outline, drawn a row and a column of cells at a time
+            extent = self.size * scaled_grid_size
+            for i in range(self.size):
+                start = i * scaled_grid_size
+                width = min(2, scaled_grid_size)
+                for line in (start, start + scaled_grid_size - width):
+                    surface.fill((0, 255, 0), pygame.Rect(line, 0, width, extent))
+                    surface.fill((0, 255, 0), pygame.Rect(0, line, extent, width))
+            # Draw building icons where present
+            for gy, gx in zip(gys.tolist(), gxs.tolist()):
+                rect = pygame.Rect(gx * scaled_grid_size, gy * scaled_grid_size, scaled_grid_size, scaled_grid_size)
+                pygame.draw.rect(surface, (0, 120, 255), rect.inflate(-scaled_grid_size//3, -scaled_grid_size//3))
+        # Outline planets a friendly builder is close enough to build on
+        if highlight:
+            pygame.draw.rect(surface, BUILDABLE_HIGHLIGHT, pygame.Rect(0, 0, scaled_size, scaled_size), 2)
+        return surface
 
     def can_build(self, player_id):
         # You cannot build if any cell is occupied by an enemy building
-        for row in self.planet_grid:
-            for cell in row:
-                if cell is not None and cell['owner'] != player_id:
-                    return False
-        return True
+        return not ((self.grid_owner >= 0) & (self.grid_owner != player_id)).any()
+
+    def occupied(self):
+        """[y, x] mask of cells with a building on them"""
+        return self.planet_grid != 0
+
+    def building_counts(self):
+        """{building type: how many this planet has}"""
+        counts = np.bincount(self.planet_grid.ravel(), minlength=len(BUILDING_TYPE_NAMES))
+        return {BUILDING_TYPE_NAMES[type_id]: int(counts[type_id]) for type_id in np.flatnonzero(counts[1:]) + 1}
 
     def place_building(self, grid_x, grid_y, player_id, building_type=None):
-        if 0 <= grid_x < self.size and 0 <= grid_y < self.size and self.planet_grid[grid_y][grid_x] is None:
-            self.planet_grid[grid_y][grid_x] = {'owner': player_id, 'type': building_type or 'BUILDING'}
+        if 0 <= grid_x < self.size and 0 <= grid_y < self.size and self.planet_grid[grid_y, grid_x] == 0:
+            self.planet_grid[grid_y, grid_x] = building_type_id(building_type or 'BUILDING')
+            self.grid_owner[grid_y, grid_x] = player_id
+            for resource, amount in BUILDING_PRODUCTION.get(building_type, {}).items():
+                self.production[resource] = self.production.get(resource, 0) + amount
+            self.version += 1
             return True
         return False
 
@@ -97,6 +181,7 @@ class Planet(Unit):
                 'position': (grid_x, grid_y),
                 'level': 1
             })
+            self.version += 1
             return True
         return False
 
@@ -113,28 +198,13 @@ class Planet(Unit):
                     for resource, amount in upgrade_cost.items():
                         self.owner.spend_resource(resource, amount)
                     building['level'] += 1
+                    self.version += 1
                     return True
         return False
 
     def get_resource_production(self):
         # Base planet resources plus building production
-        from .constants import BUILDING_PRODUCTION
-        production = self.resources.copy()
-        
-        # Add production from buildings
-        for row in self.planet_grid:
-            for cell in row:
-                if cell is not None:
-                    building_type = cell.get('type')
-                    if building_type in BUILDING_PRODUCTION:
-                        building_production = BUILDING_PRODUCTION[building_type]
-                        for resource, amount in building_production.items():
-                            if resource in production:
-                                production[resource] += amount
-                            else:
-                                production[resource] = amount
-        
-        return production
+        return dict(self.production)
 
     def can_build_type(self, building_type):
         """Check if this building type can be built on this planet type"""
@@ -188,12 +258,17 @@ class Planet(Unit):
             pygame.draw.rect(screen, WHITE, building_rect, 1)
             
             # Draw building level
-            level_font = pygame.font.Font(None, 20)
-            level_text = level_font.render(str(building['level']), True, WHITE)
+            level_text = render_text(str(building['level']), 20, WHITE)
             screen.blit(level_text, (building_rect.centerx - 5, building_rect.centery - 5))
 
     def render_tooltip(self, screen, offset_x=0, offset_y=0):
-        font = pygame.font.Font(None, 18)
+        screen.blit(self.cached_tooltip(self.tooltip_key(), self.tooltip_lines), (offset_x, offset_y))
+
+    def tooltip_key(self):
+        # Buildings are the only thing on the tooltip that changes
+        return self.version
+
+    def tooltip_lines(self):
         lines = [
             f"{self.system_label}-{self.type_label} ({self.planet_type.title()})",
             f"Size: {self.size}x{self.size}"
@@ -217,87 +292,56 @@ class Planet(Unit):
             lines.append("Allowed Buildings:")
             for building in allowed_buildings:
                 lines.append(f"  {building}")
-        
-        width = max(font.size(line)[0] for line in lines) + 12
-        height = len(lines) * 22 + 8
-        tooltip_rect = pygame.Rect(
-            offset_x,
-            offset_y,
-            width,
-            height
-        )
-        pygame.draw.rect(screen, (30, 30, 30), tooltip_rect)
-        pygame.draw.rect(screen, (255, 255, 255), tooltip_rect, 1)
-        for i, line in enumerate(lines):
-            text = font.render(line, True, (255, 255, 255))
-            screen.blit(text, (tooltip_rect.x + 6, tooltip_rect.y + 4 + i * 22))
+        return lines
 
 class Sun(Planet):
-    def __init__(self, sun_type, grid_position, system_label):
+    def __init__(self, sun_type, grid_position, system_label, rng=None, resources=None):
         sun_info = SUN_TYPES[sun_type]
-        super().__init__('SUN', grid_position, size=sun_info['size'], system_label=system_label)
+        super().__init__('SUN', grid_position, size=sun_info['size'], system_label=system_label, rng=rng, resources=resources)
         self.sun_type = sun_type
         self.color = sun_info['color']
         self.type_label = sun_info['label']
         self.sun_type_name = sun_type.replace('_', ' ').title()
 
-    def render(self, screen, offset_x, offset_y, zoom_level=1.0):
-        scaled_grid_size = round(GRID_SIZE * zoom_level)
+    def bake_surface(self, scaled_grid_size, highlight=False):
         scaled_size = max(10, int(self.size * scaled_grid_size))
-        px = self.grid_position[0] * scaled_grid_size + offset_x
-        py = self.grid_position[1] * scaled_grid_size + offset_y
-        rect = pygame.Rect(px, py, scaled_size, scaled_size)
+        surface, label_text = self._label_surface(scaled_size, scaled_size, scaled_size)
+        rect = pygame.Rect(0, 0, scaled_size, scaled_size)
         # Draw main square
-        pygame.draw.rect(screen, self.color, rect)
+        pygame.draw.rect(surface, self.color, rect)
         # Draw darker border for all suns
         border_color = tuple(max(0, c - 60) for c in self.color)
-        pygame.draw.rect(screen, border_color, rect, max(2, scaled_size // 10))
+        pygame.draw.rect(surface, border_color, rect, max(2, scaled_size // 10))
         # Draw label
-        font = pygame.font.Font(None, max(14, scaled_size // 2))
-        label_text = font.render(f"{self.system_label}-{self.type_label}", True, (255, 255, 255))
-        screen.blit(label_text, (px + 2, py + 2))
+        if label_text is not None:
+            surface.blit(label_text, (2, 2))
+        return surface
 
-    def render_tooltip(self, screen, offset_x=0, offset_y=0):
-        font = pygame.font.Font(None, 18)
-        lines = [
+    def tooltip_lines(self):
+        return [
             f"{self.system_label}-{self.type_label} ({self.sun_type_name})",
             f"Size: {self.size}x{self.size}"
         ]
-        width = max(font.size(line)[0] for line in lines) + 12
-        height = len(lines) * 22 + 8
-        tooltip_rect = pygame.Rect(
-            offset_x,
-            offset_y,
-            width,
-            height
-        )
-        pygame.draw.rect(screen, (30, 30, 30), tooltip_rect)
-        pygame.draw.rect(screen, (255, 255, 255), tooltip_rect, 1)
-        for i, line in enumerate(lines):
-            text = font.render(line, True, (255, 255, 255))
-            screen.blit(text, (tooltip_rect.x + 6, tooltip_rect.y + 4 + i * 22))
 
 class Moon(Unit):
-    def __init__(self, grid_position, parent_planet=None):
+    def __init__(self, grid_position, parent_planet=None, rng=None):
         super().__init__('MOON', grid_position, size=1)
         self.parent_planet = parent_planet
-        self.resources = {'Minerals': np.random.randint(2, 10)}
+        self.resources = {'Minerals': int((rng or np.random.default_rng()).integers(2, 10))}
     def get_color(self):
         return (200, 200, 200)  # Light gray
     def render(self, screen, offset_x=0, offset_y=0):
         super().render(screen, offset_x, offset_y)
-        font = pygame.font.Font(None, 16)
-        label_text = font.render('M', True, WHITE)
+        label_text = render_text('M', 16, WHITE)
         screen.blit(label_text, (self.grid_position[0] * GRID_SIZE + offset_x + 2, self.grid_position[1] * GRID_SIZE + offset_y + 2))
 
 class Asteroid(Unit):
-    def __init__(self, grid_position):
+    def __init__(self, grid_position, rng=None):
         super().__init__('ASTEROID', grid_position, size=1)
-        self.resources = {'Minerals': np.random.randint(1, 6)}
+        self.resources = {'Minerals': int((rng or np.random.default_rng()).integers(1, 6))}
     def get_color(self):
         return (120, 120, 120)  # Dark gray
     def render(self, screen, offset_x=0, offset_y=0):
         super().render(screen, offset_x, offset_y)
-        font = pygame.font.Font(None, 16)
-        label_text = font.render('A', True, WHITE)
+        label_text = render_text('A', 16, WHITE)
         screen.blit(label_text, (self.grid_position[0] * GRID_SIZE + offset_x + 2, self.grid_position[1] * GRID_SIZE + offset_y + 2)) 
\ No newline at end of file
@@ -0,0 +1,123 @@
+import numpy as np
+from .constants import *
+
+
+class ProductionLedger:
+    """Per-turn production of every planet, kept as NumPy arrays.
+
+    Each planet has a row in `counts`: how many buildings of each type it
+    has, followed by its own base resources. `weights` turns one such row
+    into resources, so it stacks BUILDING_PRODUCTION as a building types x
+    resources matrix on top of an identity for the base resources. Every
+    player's income is then a sum of rows grouped by owner and a single
+    matrix product, cached until Galaxy reports a planet, building or owner
+    change through its funnels.
+    """
+    def __init__(self, capacity=ECONOMY_CAPACITY):
+        self.building_ids = {building: i for i, building in enumerate(BUILDING_PRODUCTION)}
+        self.resources = []  # Resource names, in column order
+        self.resource_ids = {}
+        self.weights = np.zeros((len(self.building_ids), 0))
+        self.counts = np.zeros((capacity, len(self.building_ids)))
+        self.owner = np.full(capacity, -1, dtype=np.int32)  # Owner id per row, -1 for none or a free row
+        self.owners = []  # Owner for each owner id
+        self.owner_ids = {}
+        self.rows = {}  # id(planet) -> row
+        self.free = []  # Rows of removed planets, reused first
+        self.size = 0  # Rows handed out so far
+        self._incomes = None
+        for building, production in BUILDING_PRODUCTION.items():
+            for resource, amount in production.items():
+                column = self._resource(resource)
+                self.weights[self.building_ids[building], column] = amount
+
+    def _resource(self, name):
+        """Column of resource name in weights, adding one if it is new"""
+        column = self.resource_ids.get(name)
+        if column is None:
+            column = self.resource_ids[name] = len(self.resources)
+            self.resources.append(name)
+            weights = np.zeros((self.weights.shape[0] + 1, column + 1))
+            weights[:-1, :-1] = self.weights
+            weights[-1, -1] = 1  # A planet's own base resource counts as is
+            self.weights = weights
+            self.counts = np.hstack([self.counts, np.zeros((len(self.counts), 1))])
+        return column
+
+    def _owner(self, owner):
+        if owner is None:
+            return -1
+        owner_id = self.owner_ids.get(owner)
+        if owner_id is None:
+            owner_id = self.owner_ids[owner] = len(self.owners)
+            self.owners.append(owner)
+        return owner_id
+
+    def clear(self):
+        self.counts[:self.size] = 0
+        self.owner[:self.size] = -1
+        self.rows.clear()
+        self.free.clear()
+        self.size = 0
+        self._incomes = None
+
+    def add_planet(self, planet):
+        if self.free:
+            row = self.free.pop()
+        else:
+            row = self.size
+            self.size += 1
+            if row == len(self.owner):
+                self.counts = np.vstack([self.counts, np.zeros_like(self.counts)])
+                self.owner = np.concatenate([self.owner, np.full(len(self.owner), -1, dtype=np.int32)])
+        self.rows[id(planet)] = row
+        for resource, amount in planet.resources.items():
+            column = len(self.building_ids) + self._resource(resource)
+            self.counts[row, column] = amount
+        for building_type, count in planet.building_counts().items():
+            if building_type in self.building_ids:
+                self.counts[row, self.building_ids[building_type]] = count
+        self.owner[row] = self._owner(planet.owner)
+        self._incomes = None
+
+    def remove_planet(self, planet):
+        row = self.rows.pop(id(planet), None)
+        if row is not None:
+            self.counts[row] = 0
+            self.owner[row] = -1
+            self.free.append(row)
+            self._incomes = None
+
+    def set_owner(self, planet, owner):
+        self.owner[self.rows[id(planet)]] = self._owner(owner)
+        self._incomes = None
+
+    def add_building(self, planet, building_type):
+        """Count a building just placed on planet"""
+        building_id = self.building_ids.get(building_type)
+        if building_id is not None:
+            self.counts[self.rows[id(planet)], building_id] += 1
+            self._incomes = None
+
+    def incomes(self):
+        """{owner: (planets owned, {resource: amount per turn})} for every owner with a planet"""
+        if self._incomes is None:
+            owner = self.owner[:self.size]
+            # One row per owner picking out their planets, so the group-by is a matrix product too
+            members = owner == np.arange(len(self.owners))[:, None]
+            totals = np.rint(members.astype(np.float64) @ self.counts[:self.size] @ self.weights).astype(np.int64)
+            planets = members.sum(axis=1)
+            self._incomes = {}
+            for owner_id, owner in enumerate(self.owners):
+                if planets[owner_id]:
+                    amounts = totals[owner_id].tolist()
+                    self._incomes[owner] = (int(planets[owner_id]), {
+                        resource: amount for resource, amount in zip(self.resources, amounts) if amount})
+        return self._incomes
+
+    def income(self, owner):
+        """What owner's planets produce per turn, resources with nothing coming in left out"""
+        return dict(self.incomes().get(owner, (0, {}))[1])
+
+    def planet_count(self, owner):
+        return self.incomes().get(owner, (0, {}))[0]
@@ -0,0 +1,245 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .constants import *
+from .grid import CHUNK_SIZE
+from .move_range import MoveTiles
+
+# Terrain codes are the cost of stepping onto a cell; anything from SHIP up can't be entered
+OPEN = 1
+ASTEROID = 2
+SHIP = 254
+BLOCKED = 255  # Planets, suns and everything off the map
+UNREACHED = 127  # Also the cost of entering a blocked cell, so sums still fit a byte
+
+_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def relax(dist, cost, steps, unreached=UNREACHED):
+    """Shortest step costs from the window starts, for paths of up to steps moves.
+
+    dist and cost are (n, w, h) arrays indexed [window, x, y], whose last
+    row and column are padding that costs unreached, so the windows can be
+    relaxed as one flat array without leaking into each other. dist holds
+    0 at each start and unreached elsewhere and is updated in place; twice
+    unreached must still fit its dtype. Every cell whose cheapest path fits in steps moves ends up
+    exact, which covers everything a ship with move_range <= steps can reach.
+    """
+    row = dist.shape[2]
+    d = dist.reshape(-1)
+    c = cost.reshape(-1)
+    best = np.empty_like(d)
+    for _ in range(steps):
+        # Cheapest neighbour of every cell, plus the cost of stepping onto it
+        best[row:] = d[:-row]
+        best[:row] = unreached
+        np.minimum(best[:-row], d[row:], out=best[:-row])
+        np.minimum(best[1:], d[:-1], out=best[1:])
+        np.minimum(best[:-1], d[1:], out=best[:-1])
+        best += c
+        np.minimum(d, best, out=d)
+    return dist
+
+
+class Reach:
+    """Where one ship can get to this turn, as step costs over the window around it"""
+    def __init__(self, galaxy, ship, origin, move_range, dist, terrain, key=None):
+        self.galaxy = galaxy
+        self.key = key  # What it was computed from, see Reachability.key
+        self.ship = ship
+        self.origin = origin
+        self.move_range = move_range
+        self.dist = dist  # [x, y] around origin, origin at the center
+        self.terrain = terrain
+        self.radius = dist.shape[0] // 2
+        self._tiles = None
+        self._costs = None
+
+    def _local(self, pos):
+        lx = pos[0] - self.origin[0] + self.radius
+        ly = pos[1] - self.origin[1] + self.radius
+        if 0 <= lx < self.dist.shape[0] and 0 <= ly < self.dist.shape[1]:
+            return lx, ly
+        return None
+
+    def cost_to(self, pos):
+        """Movement spent getting to pos, or None if it is out of reach"""
+        return self.tiles_cost().get(tuple(pos))
+
+    def can_reach(self, pos):
+        return tuple(pos) in self.tiles
+
+    @property
+    def tiles(self):
+        if self._tiles is None:
+            self._tiles = MoveTiles(self.origin, self.move_range, self.tiles_cost())
+        return self._tiles
+
+    def tiles_cost(self):
+        if self._costs is None:
+            ox, oy = self.origin[0] - self.radius, self.origin[1] - self.radius
+            xs, ys = np.nonzero((self.dist <= self.move_range) & (self.terrain < SHIP))
+            costs = dict(zip(zip((xs + ox).tolist(), (ys + oy).tolist()), self.dist[xs, ys].tolist()))
+            costs.pop(self.origin, None)
+            # Fighters and bombers may end their move inside a friendly Carrier
+            for pos, cost in self._docking_entries():
+                costs[pos] = cost
+            self._costs = costs
+        return self._costs
+
+    def _docking_entries(self):
+        ship = self.ship
+        if ship.label not in ('FIG', 'BOM'):
+            return []
+        entry = np.full(self.dist.shape, UNREACHED, dtype=self.dist.dtype)
+        np.minimum(entry[1:], self.dist[:-1], out=entry[1:])
+        np.minimum(entry[:-1], self.dist[1:], out=entry[:-1])
+        np.minimum(entry[:, 1:], self.dist[:, :-1], out=entry[:, 1:])
+        np.minimum(entry[:, :-1], self.dist[:, 1:], out=entry[:, :-1])
+        entry += 1
+        found = []
+        for x, y in zip(*np.nonzero((self.terrain == SHIP) & (entry <= self.move_range))):
+            pos = (int(x) + self.origin[0] - self.radius, int(y) + self.origin[1] - self.radius)
+            carrier = self.galaxy.ship_at(pos)
+            if (carrier is not None and carrier is not ship and carrier.label == 'CAR'
+                    and carrier.owner == ship.owner and carrier.can_dock(ship)):
+                found.append((pos, int(entry[x, y])))
+        return found
+
+    def path_to(self, pos):
+        """Cells visited on the cheapest way to pos, origin excluded; None if out of reach"""
+        costs = self.tiles_cost()
+        pos = tuple(pos)
+        if pos not in costs:
+            return None
+        path = [pos]
+        remaining = costs[pos]
+        cur = pos
+        while cur != self.origin:
+            step = int(self.terrain[self._local(cur)])
+            remaining -= OPEN if step >= SHIP else step  # Docking into a Carrier costs one step
+            for dx, dy in _STEPS:
+                prev = (cur[0] + dx, cur[1] + dy)
+                local = self._local(prev)
+                if local is not None and self.dist[local] == remaining and (prev == self.origin or self.terrain[local] < SHIP):
+                    cur = prev
+                    break
+            else:
+                return None
+            if cur != self.origin:
+                path.append(cur)
+        path.reverse()
+        return path
+
+
+class Reachability:
+    """Obstacle-aware move ranges for ships, cached until something nearby changes.
+
+    Planets, suns, other ships and the map edge block movement, and
+    asteroid cells cost two steps instead of one. Terrain costs are kept
+    per 64-cell chunk with a margin of REACH_MARGIN cells around it, so
+    the window around any ship is a plain slice. Galaxy reports changed
+    cells through mark_rect, which drops the affected chunks; each ship
+    keeps its last result until the key it was computed from goes stale.
+    """
+    def __init__(self, galaxy, margin=REACH_MARGIN):
+        self.galaxy = galaxy
+        self.margin = margin
+        self.terrain = {}  # chunk key -> uint8 costs for the chunk plus margin
+        self.epochs = {}  # chunk key -> times its terrain has changed
+        self.generation = 0  # Bumped when everything is invalidated at once
+
+    def invalidate(self):
+        self.terrain.clear()
+        self.generation += 1
+
+    def mark_rect(self, x, y, w, h):
+        cs, m = CHUNK_SIZE, self.margin
+        for cx in range((x - m) // cs, (x + w - 1 + m) // cs + 1):
+            for cy in range((y - m) // cs, (y + h - 1 + m) // cs + 1):
+                key = (cx, cy)
+                self.terrain.pop(key, None)
+                self.epochs[key] = self.epochs.get(key, 0) + 1
+
+    def terrain_window(self, x0, y0, w, h):
+        galaxy = self.galaxy
+        occupancy = galaxy.occupancy
+        terrain = np.full((w, h), OPEN, dtype=np.uint8)
+        terrain[galaxy.asteroids.grid.window(x0, y0, w, h)] = ASTEROID
+        terrain[occupancy.ship_cells.window(x0, y0, w, h) != 0] = SHIP
+        terrain[occupancy.body_cells.window(x0, y0, w, h) != 0] = BLOCKED
+        # Nothing past the edges of the map
+        terrain[:max(0, -x0)] = BLOCKED
+        terrain[max(0, galaxy.size - x0):] = BLOCKED
+        terrain[:, :max(0, -y0)] = BLOCKED
+        terrain[:, max(0, galaxy.size - y0):] = BLOCKED
+        return terrain
+
+    def chunk_terrain(self, key):
+        terrain = self.terrain.get(key)
+        if terrain is None:
+            cs, m = CHUNK_SIZE, self.margin
+            terrain = self.terrain[key] = self.terrain_window(key[0] * cs - m, key[1] * cs - m, cs + 2 * m, cs + 2 * m)
+        return terrain
+
+    def key(self, ship):
+        x, y = ship.grid_position
+        # The ship's chunk terrain covers its whole window, so its epoch is all that matters
+        return (ship.grid_position, ship.move_range, self.generation, self.epochs.get((x // CHUNK_SIZE, y // CHUNK_SIZE), 0))
+
+    def of(self, ship):
+        return self.many([ship])[0]
+
+    def many(self, ships):
+        """Reach for each ship, computing every stale one in a single batch"""
+        results = [None] * len(ships)
+        todo = []
+        keys = []
+        for i, ship in enumerate(ships):
+            cached = ship._reach
+            key = self.key(ship)
+            if cached is not None and cached.key == key and cached.galaxy is self.galaxy:
+                results[i] = cached
+            elif ship.move_range > self.margin:
+                # Too far to fit in the chunk margins, so look it up directly
+                results[i] = self._compute([ship], ship.move_range, [None], direct=True)[0]
+            else:
+                todo.append(i)
+                keys.append(key)
+        if todo:
+            batch = [ships[i] for i in todo]
+            radius = max(ship.move_range for ship in batch)
+            for i, ship, reach in zip(todo, batch, self._compute(batch, radius, keys)):
+                ship._reach = results[i] = reach
+        return results
+
+    def _compute(self, ships, radius, keys, direct=False):
+        w = 2 * radius + 1
+        terrain = np.empty((len(ships), w, w), dtype=np.uint8)
+        if direct:
+            for i, ship in enumerate(ships):
+                x, y = ship.grid_position
+                terrain[i] = self.terrain_window(x - radius, y - radius, w, w)
+        else:
+            # Cut every window out of its chunk's terrain, one chunk at a time
+            cs, m = CHUNK_SIZE, self.margin
+            by_chunk = {}
+            for i, ship in enumerate(ships):
+                x, y = ship.grid_position
+                by_chunk.setdefault((x // cs, y // cs), []).append(i)
+            xs = np.array([ship.grid_position[0] for ship in ships])
+            ys = np.array([ship.grid_position[1] for ship in ships])
+            for key, idx in by_chunk.items():
+                if len(idx) == 1:
+                    lx, ly = xs[idx[0]] - key[0] * cs + m, ys[idx[0]] - key[1] * cs + m
+                    terrain[idx[0]] = self.chunk_terrain(key)[lx - radius:lx + radius + 1, ly - radius:ly + radius + 1]
+                    continue
+                windows = sliding_window_view(self.chunk_terrain(key), (w, w))
+                terrain[idx] = windows[xs[idx] - key[0] * cs + m - radius, ys[idx] - key[1] * cs + m - radius]
+        cost = np.full((len(ships), w + 1, w + 1), UNREACHED, dtype=np.uint8)
+        np.minimum(terrain, UNREACHED, out=cost[:, :w, :w])
+        dist = np.full(cost.shape, UNREACHED, dtype=np.uint8)
+        dist[:, radius, radius] = 0
+        relax(dist, cost, radius)
+        galaxy = self.galaxy
+        return [Reach(galaxy, ship, ship.grid_position, ship.move_range, dist[i, :w, :w], terrain[i], key)
+                for i, (ship, key) in enumerate(zip(ships, keys))]
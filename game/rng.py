@@ -0,0 +1,27 @@
+import zlib
+import numpy as np
+
+
+class GenerationContext:
+    """Seeded source of independent RNG streams for world generation.
+
+    Each subsystem asks for its own named stream, so adding or removing
+    random draws in one place (say, asteroid shapes) never shifts what
+    another subsystem (say, planet placement) gets for the same seed.
+    """
+    def __init__(self, seed=None):
+        if seed is None:
+            # Pick a random seed but keep it, so any run can be reproduced
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.seed = seed
+
+    def stream(self, name):
+        """Return a fresh numpy Generator for the named subsystem"""
+        sequence = np.random.SeedSequence(self.seed, spawn_key=(zlib.crc32(name.encode()),))
+        return np.random.Generator(np.random.PCG64(sequence))
+
+    def sector_stream(self, sector, name):
+        """Return a fresh Generator for one subsystem of one galaxy sector"""
+        sx, sy = sector
+        sequence = np.random.SeedSequence(self.seed, spawn_key=(zlib.crc32(name.encode()), sx, sy))
+        return np.random.Generator(np.random.PCG64(sequence))
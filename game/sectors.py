@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from .constants import *
+from .asteroids import PATCH_OVERHANG
+from .grid import CHUNK_SIZE
+from .planet import SUN_TYPES
+from .systems import sample_sun_positions, system_label
+
+
+class Sector:
+    def __init__(self, key):
+        self.key = key
+        self.bodies = []  # Suns and planets generated for this sector
+        self.pinned = False  # Changed by a player, so it can't simply be regenerated
+
+
+class SectorMap:
+    """Fixed-size galaxy sectors that are generated the first time they are needed.
+
+    Each sector is built only from its own seeded streams, so it comes out
+    the same whenever (and however often) it is generated. Once more than
+    max_loaded sectors are in memory, the least recently used ones that
+    hold no ships, no selection and no player changes are evicted and
+    simply rebuilt on the next visit.
+    """
+    def __init__(self, galaxy, sector_size=SECTOR_SIZE, max_loaded=MAX_LOADED_SECTORS):
+        if sector_size % CHUNK_SIZE:
+            raise ValueError("sector_size must be a multiple of the grid chunk size")
+        self.galaxy = galaxy
+        self.sector_size = sector_size
+        self.max_loaded = max_loaded
+        self.loaded = OrderedDict()  # (sx, sy) -> Sector, least recently used first
+        self.generated = 0  # Sectors generated so far, including regenerations
+        self.evicted = 0
+
+    def key_of(self, x, y):
+        return (x // self.sector_size, y // self.sector_size)
+
+    def bounds_of(self, key):
+        sx, sy = key
+        size = self.galaxy.size
+        x0 = sx * self.sector_size
+        y0 = sy * self.sector_size
+        return x0, y0, min(size, x0 + self.sector_size), min(size, y0 + self.sector_size)
+
+    def ensure_cell(self, x, y):
+        if 0 <= x < self.galaxy.size and 0 <= y < self.galaxy.size:
+            self.ensure(self.key_of(x, y))
+
+    def ensure_rect(self, x0, y0, x1, y1):
+        """Load every sector overlapping x0 <= x < x1, y0 <= y < y1; returns their keys"""
+        size = self.galaxy.size
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(size, x1), min(size, y1)
+        if x1 <= x0 or y1 <= y0:
+            return []
+        sx0, sy0 = self.key_of(x0, y0)
+        sx1, sy1 = self.key_of(x1 - 1, y1 - 1)
+        keys = [(sx, sy) for sx in range(sx0, sx1 + 1) for sy in range(sy0, sy1 + 1)]
+        for key in keys:
+            self.ensure(key)
+        return keys
+
+    def ensure(self, key):
+        sector = self.loaded.get(key)
+        if sector is None:
+            sector = self.generate(key)
+            self.loaded[key] = sector
+        else:
+            self.loaded.move_to_end(key)
+        return sector
+
+    def pin(self, pos):
+        """Keep the sector holding pos loaded for good, e.g. after a building is placed"""
+        self.ensure(self.key_of(*pos)).pinned = True
+
+    def generate(self, key):
+        galaxy = self.galaxy
+        sx, sy = key
+        x0, y0, x1, y1 = self.bounds_of(key)
+        rng = galaxy.generation.sector_stream(key, 'systems')
+        resource_rng = galaxy.generation.sector_stream(key, 'resources')
+        asteroid_rng = galaxy.generation.sector_stream(key, 'asteroids')
+        sector = Sector(key)
+
+        # Suns keep half the minimum distance away from the sector edges, so
+        # systems in neighbouring sectors never end up closer than that
+        fixed = [(x, y) for x, y in galaxy.spawn_points() if x0 <= x < x1 and y0 <= y < y1]
+        margin = SECTOR_SYSTEM_MARGIN
+        count = int(rng.integers(SECTOR_SYSTEMS[0], SECTOR_SYSTEMS[1] + 1))
+        bounds = (x0 + margin, y0 + margin, x1 - margin - SUN_FOOTPRINT, y1 - margin - SUN_FOOTPRINT)
+        positions = fixed + sample_sun_positions(
+            rng, count, SYSTEM_MIN_DISTANCE, bounds, fixed=fixed,
+            is_free=lambda x, y: galaxy.is_space_free(x, y, SUN_FOOTPRINT))
+        sun_types = list(SUN_TYPES.keys())
+        systems = [(pos, f"{system_label(i)}{sx}.{sy}", sun_types[rng.integers(len(sun_types))])
+                   for i, pos in enumerate(positions)]
+        sector.bodies = galaxy.place_systems(systems, rng, resource_rng)
+
+        # Patch centers stay their widest reach inside the sector so no cell spills over
+        reach = ASTEROID_PATCH_RADIUS[1] + PATCH_OVERHANG
+        patches = int(asteroid_rng.integers(SECTOR_ASTEROID_PATCHES[0], SECTOR_ASTEROID_PATCHES[1] + 1))
+        galaxy.place_asteroid_patches(asteroid_rng, patches, (x0 + reach, y0 + reach, x1 - reach, y1 - reach),
+                                      sector.bodies)
+        self.generated += 1
+        return sector
+
+    def trim(self, keep=()):
+        """Evict least recently used sectors until at most max_loaded remain"""
+        if len(self.loaded) <= self.max_loaded:
+            return
+        galaxy = self.galaxy
+        keep = set(keep)
+        keep.update(self.key_of(*ship.grid_position) for ship in galaxy.ships)
+        if galaxy.selected_unit is not None:
+            keep.add(self.key_of(*galaxy.selected_unit.grid_position))
+        for key in list(self.loaded):
+            if len(self.loaded) <= self.max_loaded:
+                break
+            if key not in keep and not self.loaded[key].pinned:
+                self.evict(key)
+
+    def evict(self, key):
+        sector = self.loaded.pop(key)
+        x0, y0, x1, y1 = self.bounds_of(key)
+        self.galaxy.remove_planets(sector.bodies)
+        # Planets of systems next door may reach into this sector, so only free chunks left empty
+        self.galaxy.occupancy.body_cells.drop_chunks(x0, y0, x1, y1, empty_only=True)
+        self.galaxy.asteroids.clear_rect(x0, y0, x1, y1)
+        self.galaxy.mark_changed(x0, y0, x1 - x0, y1 - y0)
+        self.evicted += 1
@@ -0,0 +1,151 @@
+from .constants import SPATIAL_BUCKET, FLEET_BUCKET
+
+
+class SpatialHash:
+    """Uniform bucket grid of objects covering rectangles of cells.
+
+    query() only visits the buckets overlapping the requested rect, so
+    culling costs what is near the camera rather than what is on the map.
+    Results come back in insertion order, matching a plain list.
+    """
+    def __init__(self, bucket_size=SPATIAL_BUCKET):
+        self.bucket_size = bucket_size
+        self.buckets = {}  # (bx, by) -> {id(obj): obj}
+        self.entries = {}  # id(obj) -> (order, bucket keys)
+        self._next = 0
+
+    def clear(self):
+        self.buckets.clear()
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _keys(self, x, y, w, h):
+        b = self.bucket_size
+        return [(bx, by) for bx in range(x // b, (x + w - 1) // b + 1)
+                for by in range(y // b, (y + h - 1) // b + 1)]
+
+    def insert(self, obj, x, y, w=1, h=1):
+        keys = self._keys(x, y, w, h)
+        self.entries[id(obj)] = (self._next, keys)
+        self._next += 1
+        for key in keys:
+            self.buckets.setdefault(key, {})[id(obj)] = obj
+
+    def remove(self, obj):
+        entry = self.entries.pop(id(obj), None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            bucket = self.buckets[key]
+            del bucket[id(obj)]
+            if not bucket:
+                del self.buckets[key]
+
+    def move(self, obj, x, y, w=1, h=1):
+        """Re-file obj under a new rect, keeping its place in the order"""
+        entry = self.entries.get(id(obj))
+        keys = self._keys(x, y, w, h)
+        if entry is not None and entry[1] == keys:
+            return
+        order = entry[0] if entry is not None else None
+        self.remove(obj)
+        self.insert(obj, x, y, w, h)
+        if order is not None:
+            self.entries[id(obj)] = (order, keys)
+
+    def query(self, x0, y0, x1, y1):
+        """Objects whose buckets overlap x0 <= x < x1, y0 <= y < y1; callers still test exact bounds"""
+        if x1 <= x0 or y1 <= y0:
+            return []
+        b = self.bucket_size
+        found = {}
+        for bx in range(x0 // b, (x1 - 1) // b + 1):
+            for by in range(y0 // b, (y1 - 1) // b + 1):
+                bucket = self.buckets.get((bx, by))
+                if bucket:
+                    found.update(bucket)
+        entries = self.entries
+        return sorted(found.values(), key=lambda obj: entries[id(obj)][0])
+
+
+class FleetIndex:
+    """Ships filed by (owner, label), each group in its own SpatialHash.
+
+    Answers "nearest friendly Carrier" or "any Builder within 6 cells"
+    by looking at the buckets around a position instead of every ship.
+    Distances are Manhattan, like movement, and ties go to the ship that
+    was added first, matching a scan of the ship list.
+    """
+    def __init__(self, bucket_size=FLEET_BUCKET):
+        self.bucket_size = bucket_size
+        self.groups = {}  # (owner, label) -> SpatialHash
+        self.keys = {}  # id(ship) -> (owner, label) it was filed under
+
+    def clear(self):
+        self.groups.clear()
+        self.keys.clear()
+
+    def insert(self, ship):
+        key = (ship.owner, getattr(ship, 'label', None))
+        self.keys[id(ship)] = key
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = SpatialHash(self.bucket_size)
+        group.insert(ship, ship.grid_position[0], ship.grid_position[1])
+
+    def remove(self, ship):
+        key = self.keys.pop(id(ship), None)
+        if key is not None:
+            self.groups[key].remove(ship)
+
+    def move(self, ship, x, y):
+        key = self.keys.get(id(ship))
+        if key is not None:
+            self.groups[key].move(ship, x, y)
+
+    def within(self, owner, label, pos, radius):
+        """Ships of owner with label at most radius cells from pos"""
+        group = self.groups.get((owner, label))
+        if not group:
+            return []
+        x, y = pos
+        return [ship for ship in group.query(x - radius, y - radius, x + radius + 1, y + radius + 1)
+                if abs(ship.grid_position[0] - x) + abs(ship.grid_position[1] - y) <= radius]
+
+    def nearest(self, owner, label, pos, where=None):
+        """Closest ship of owner with label to pos for which where(ship) holds, or None"""
+        group = self.groups.get((owner, label))
+        if not group:
+            return None
+        x, y = pos
+        b = self.bucket_size
+        bx, by = x // b, y // b
+        best = None
+        best_key = None
+        visited = 0
+        ring = 0
+        while True:
+            if ring == 0:
+                keys = [(bx, by)]
+            else:
+                keys = [(bx + dx, by + dy) for dx in range(-ring, ring + 1) for dy in (-ring, ring)]
+                keys += [(bx + dx, by + dy) for dx in (-ring, ring) for dy in range(-ring + 1, ring)]
+            visited += len(keys)
+            if visited > len(group):
+                # Sparse fleets are cheaper to scan than an ever wider ring of empty buckets
+                keys = list(group.buckets)
+            for key in keys:
+                for ship in group.buckets.get(key, {}).values():
+                    if where is not None and not where(ship):
+                        continue
+                    rank = (abs(ship.grid_position[0] - x) + abs(ship.grid_position[1] - y), group.entries[id(ship)][0])
+                    if best_key is None or rank < best_key:
+                        best, best_key = ship, rank
+            if visited > len(group):
+                return best
+            # Anything in the next ring is at least ring * b + 1 cells away
+            if best_key is not None and best_key[0] <= ring * b:
+                return best
+            ring += 1
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+import pygame
+from .constants import PLANET_SURFACE_BUDGET, TOOLTIP_SURFACE_BUDGET
+
+
+class SpriteAtlas:
+    """Pre-baked unit sprites, one per (class, label, owner, selected) look.
+
+    Sprites are baked for one zoom bucket at a time; when the zoom
+    changes the atlas is emptied and entries are baked again on first
+    use, so drawing a unit is a single blit.
+    """
+    def __init__(self):
+        self.zoom_bucket = None
+        self.sprites = {}  # look -> Surface
+        self.baked = 0  # Sprites baked so far, for profiling
+
+    def sprite(self, unit, zoom_level):
+        bucket = round(zoom_level, 2)
+        if bucket != self.zoom_bucket:
+            self.sprites.clear()
+            self.zoom_bucket = bucket
+        key = (type(unit), getattr(unit, 'label', None), unit.owner, unit.selected)
+        surface = self.sprites.get(key)
+        if surface is None:
+            surface = bake(unit.bake_sprite(zoom_level))
+            self.sprites[key] = surface
+            self.baked += 1
+        return surface
+
+
+unit_sprites = SpriteAtlas()  # Shared by every unit
+
+
+class SurfaceBudget:
+    """Caps the memory held by surfaces that objects cache on themselves.
+
+    Objects report each surface they bake along with a callback that
+    forgets it; once the total passes max_bytes, the least recently drawn
+    ones are dropped.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.owners = OrderedDict()  # id(obj) -> (drop callback, bytes), least recently drawn first
+
+    def touch(self, obj):
+        if id(obj) in self.owners:
+            self.owners.move_to_end(id(obj))
+
+    def add(self, obj, surface, drop):
+        old = self.owners.pop(id(obj), None)
+        if old is not None:
+            self.used -= old[1]
+        size = surface.get_bytesize() * surface.get_width() * surface.get_height()
+        self.owners[id(obj)] = (drop, size)
+        self.used += size
+        while self.used > self.max_bytes and len(self.owners) > 1:
+            _, (victim_drop, victim_size) = self.owners.popitem(last=False)
+            victim_drop()
+            self.used -= victim_size
+
+
+planet_surfaces = SurfaceBudget(PLANET_SURFACE_BUDGET)  # Shared by every planet and sun
+tooltip_surfaces = SurfaceBudget(TOOLTIP_SURFACE_BUDGET)  # Shared by every tooltip
+
+
+def bake(surface):
+    """Convert a freshly drawn surface for fast blits once a display exists"""
+    if pygame.display.get_surface() is not None:
+        return surface.convert_alpha()
+    return surface
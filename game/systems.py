@@ -0,0 +1,113 @@
+import string
+import numpy as np
+from .constants import *
+from .planet import PLANET_TYPES
+
+
+def system_label(index):
+    """A, B, ..., Z, AA, AB, ... so labels stay unique for any number of systems"""
+    letters = string.ascii_uppercase
+    label = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, len(letters))
+        label = letters[rem] + label
+    return label
+
+
+def sample_sun_positions(rng, count, min_distance, bounds, fixed=(), attempts=100, is_free=None):
+    """Poisson-disk style placement of `count` suns at least min_distance apart.
+
+    Suns are placed with bounds[0] <= x < bounds[2] and bounds[1] <= y < bounds[3].
+    Candidates are drawn in batches and checked against a background grid
+    with cells of min_distance / sqrt(2), so each check only looks at the
+    5x5 cells around the candidate and total cost is linear in `count`.
+    Positions in `fixed` are treated as already placed.
+    """
+    x0, y0, x1, y1 = bounds
+    if x1 <= x0 or y1 <= y0:
+        return []
+    cell = min_distance / np.sqrt(2)
+    grid = {}
+    min_dist_sq = min_distance ** 2
+
+    def fits(x, y):
+        gx, gy = int(x // cell), int(y // cell)
+        for nx in range(gx - 2, gx + 3):
+            for ny in range(gy - 2, gy + 3):
+                other = grid.get((nx, ny))
+                if other and (x - other[0]) ** 2 + (y - other[1]) ** 2 < min_dist_sq:
+                    return False
+        return True
+
+    for x, y in fixed:
+        grid[(int(x // cell), int(y // cell))] = (x, y)
+
+    placed = []
+    budget = count * attempts
+    batch = max(64, count * 4)
+    while len(placed) < count and budget > 0:
+        n = min(batch, budget)
+        budget -= n
+        candidates = rng.integers((x0, y0), (x1, y1), (n, 2)).tolist()
+        for x, y in candidates:
+            if fits(x, y) and (is_free is None or is_free(x, y)):
+                grid[(int(x // cell), int(y // cell))] = (x, y)
+                placed.append((x, y))
+                if len(placed) == count:
+                    break
+    return placed
+
+
+def orbit_candidates(rng, sun_pos, num_planets, attempts=PLANET_PLACEMENT_ATTEMPTS):
+    """Draw every candidate (x, y, size, type) for a system's planets in one batch.
+
+    Returns arrays shaped (num_planets, attempts); each planet takes the
+    first candidate that fits.
+    """
+    shape = (num_planets, attempts)
+    angle = rng.uniform(0, 2 * np.pi, shape)
+    distance = rng.integers(PLANET_ORBIT[0], PLANET_ORBIT[1] + 1, shape)
+    types = rng.integers(0, len(PLANET_TYPES), shape)
+    sizes = rng.integers(PLANET_SIZE[0], PLANET_SIZE[1] + 1, shape)
+    xs = (sun_pos[0] + distance * np.cos(angle)).astype(np.int64)
+    ys = (sun_pos[1] + distance * np.sin(angle)).astype(np.int64)
+    return xs, ys, sizes, types
+
+
+def _box_clear(x, y, size, boxes):
+    # Same 1-grid buffer rule as Galaxy.is_space_free, against a short list of boxes
+    for ox, oy, osize in boxes:
+        if (x + size + 1 > ox and x < ox + osize + 1 and
+            y + size + 1 > oy and y < oy + osize + 1):
+            return False
+    return True
+
+
+def build_system(task):
+    """Generate one system's planets from its own seed.
+
+    task is (sun_x, sun_y, sun_size, seed, map_size) and the result is a
+    list of (planet_type, x, y, size). Planets only avoid their own sun and
+    each other here; Galaxy re-checks them against the rest of the map when
+    merging, in system order.
+    """
+    sun_x, sun_y, sun_size, seed, map_size = task
+    rng = np.random.default_rng(seed)
+    num_planets = int(rng.integers(PLANETS_PER_SYSTEM[0], PLANETS_PER_SYSTEM[1] + 1))
+    xs, ys, sizes, types = orbit_candidates(rng, (sun_x, sun_y), num_planets)
+    # Drop candidates that hang off the map before checking for overlaps
+    in_bounds = (xs >= 0) & (ys >= 0) & (xs + sizes <= map_size) & (ys + sizes <= map_size)
+    planet_types = list(PLANET_TYPES.keys())
+    boxes = [(sun_x, sun_y, sun_size)]
+    planets = []
+    for planet_num in range(num_planets):
+        for attempt in np.flatnonzero(in_bounds[planet_num]).tolist():
+            x = int(xs[planet_num, attempt])
+            y = int(ys[planet_num, attempt])
+            size = int(sizes[planet_num, attempt])
+            if _box_clear(x, y, size, boxes):
+                boxes.append((x, y, size))
+                planets.append((planet_types[types[planet_num, attempt]], x, y, size))
+                break
+    return planets
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+import pygame
+from .constants import TEXT_CACHE_SIZE, WHITE
+
+
+class TextCache:
+    """Shared fonts and rendered text surfaces.
+
+    Fonts are created once per size. Rendered surfaces are kept per
+    (text, size, color) in least-recently-used order, so labels and
+    tooltips drawn every frame are only rasterized the first time.
+    """
+    def __init__(self, max_surfaces=TEXT_CACHE_SIZE):
+        self.max_surfaces = max_surfaces
+        self.fonts = {}  # size -> pygame.font.Font
+        self.surfaces = OrderedDict()  # (text, size, color) -> Surface, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.font(size).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return f"Text cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {len(self.surfaces)} surfaces, {len(self.fonts)} fonts"
+
+
+text_cache = TextCache()  # Shared by every module that draws text
+
+
+def get_font(size):
+    return text_cache.font(size)
+
+
+def render_text(text, size, color):
+    return text_cache.render(text, size, color)
+
+
+def tooltip_surface(lines, size=18, color=WHITE):
+    """Boxed block of text lines in the style shared by every tooltip"""
+    font = get_font(size)
+    width = max(font.size(line)[0] for line in lines) + 12
+    height = len(lines) * 22 + 8
+    surface = pygame.Surface((width, height))
+    surface.fill((30, 30, 30))
+    pygame.draw.rect(surface, color, surface.get_rect(), 1)
+    for i, line in enumerate(lines):
+        surface.blit(render_text(line, size, color), (6, 4 + i * 22))
+    return surface
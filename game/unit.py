@@ -1,5 +1,7 @@
 import pygame
 from .constants import *
+from .text_cache import render_text, tooltip_surface
+from .sprites import unit_sprites, tooltip_surfaces, bake
 
 class Unit:
     def __init__(self, unit_type, grid_position, size=1):
@@ -11,31 +13,72 @@ class Unit:
 
     def render(self, screen, offset_x=0, offset_y=0, zoom_level=1.0):
         x, y = self.grid_position
-        scaled_size = int(GRID_SIZE * self.size * zoom_level)
         rect = pygame.Rect(
             x * GRID_SIZE * zoom_level + offset_x,
             y * GRID_SIZE * zoom_level + offset_y,
-            scaled_size,
-            scaled_size
+            0,
+            0
         )
+        screen.blit(unit_sprites.sprite(self, zoom_level), rect.topleft)
+
+    def bake_sprite(self, zoom_level):
+        """Draw this unit's look at the given zoom onto a transparent surface"""
+        scaled_size = int(GRID_SIZE * self.size * zoom_level)
+        rect = pygame.Rect(0, 0, scaled_size, scaled_size)
+        label_text = None
+        width, height = scaled_size, scaled_size
+        if hasattr(self, 'label'):
+            label_text = render_text(self.label, int(16 * zoom_level), WHITE)
+            # The label background may stick out past small units
+            width = max(width, label_text.get_width() + 5)
+            height = max(height, label_text.get_height() + 3)
+        surface = pygame.Surface((max(1, width), max(1, height)), pygame.SRCALPHA)
         # Draw unit
-        pygame.draw.rect(screen, self.get_color(), rect)
+        pygame.draw.rect(surface, self.get_color(), rect)
         # Draw selection highlight
         if self.selected:
-            pygame.draw.rect(screen, WHITE, rect, 2)
+            pygame.draw.rect(surface, WHITE, rect, 2)
         # Draw label if available
-        if hasattr(self, 'label'):
-            font = pygame.font.Font(None, int(16 * zoom_level))
-            label_text = font.render(self.label, True, WHITE)
+        if label_text is not None:
             # Draw a dark background for the label
             label_bg_rect = pygame.Rect(rect.x + 1, rect.y + 1, label_text.get_width() + 4, label_text.get_height() + 2)
-            pygame.draw.rect(screen, (20, 20, 20), label_bg_rect)
+            pygame.draw.rect(surface, (20, 20, 20), label_bg_rect)
             # Top-left corner with a small margin
-            screen.blit(label_text, (rect.x + 3, rect.y + 2))
+            surface.blit(label_text, (rect.x + 3, rect.y + 2))
+        return surface
 
     def get_color(self):
         return WHITE  # Base color, override in subclasses
 
+    _tooltip = None
+    _tooltip_key = None
+    _reach = None  # Last Reachability result for this ship
+
+    def cached_tooltip(self, key, make_lines):
+        """Tooltip box for the state described by key; make_lines only runs when key changes"""
+        if self._tooltip_key != key:
+            self._tooltip = bake(tooltip_surface(make_lines()))
+            self._tooltip_key = key
+            tooltip_surfaces.add(self, self._tooltip, self.drop_tooltip)
+        else:
+            tooltip_surfaces.touch(self)
+        return self._tooltip
+
+    def drop_tooltip(self):
+        self._tooltip = None
+        self._tooltip_key = None
+
+    def tooltip_lines(self):
+        return [
+            f"{self.full_name}",
+            f"Move: {self.move_range}",
+            f"Actions Left: {self.actions_left}",
+            f"Ability: {self.ability}"
+        ]
+
+    def tooltip_key(self):
+        return (self.full_name, self.move_range, self.actions_left, self.ability)
+
     def is_at_position(self, grid_pos):
         return self.grid_position == grid_pos
 
@@ -56,15 +99,8 @@ class Unit:
             return
         from .constants import GRID_SIZE, WINDOW_WIDTH, WINDOW_HEIGHT
         x, y = self.grid_position
-        font = pygame.font.Font(None, 18)
-        lines = [
-            f"{self.full_name}",
-            f"Move: {self.move_range}",
-            f"Actions Left: {self.actions_left}",
-            f"Ability: {self.ability}"
-        ]
-        width = max(font.size(line)[0] for line in lines) + 12
-        height = len(lines) * 22 + 8
+        tooltip = self.cached_tooltip(self.tooltip_key(), self.tooltip_lines)
+        width, height = tooltip.get_size()
         # Calculate scaled grid size (try to get from parent if possible, else fallback)
         try:
             scaled_grid_size = screen.get_width() // 25  # fallback guess
@@ -89,11 +125,7 @@ class Unit:
             tooltip_rect.x = max(0, WINDOW_WIDTH - tooltip_rect.width - 8)
         if tooltip_rect.bottom > WINDOW_HEIGHT:
             tooltip_rect.y = max(0, WINDOW_HEIGHT - tooltip_rect.height - 8)
-        pygame.draw.rect(screen, (30, 30, 30), tooltip_rect)
-        pygame.draw.rect(screen, WHITE, tooltip_rect, 1)
-        for i, line in enumerate(lines):
-            text = font.render(line, True, WHITE)
-            screen.blit(text, (tooltip_rect.x + 6, tooltip_rect.y + 4 + i * 22))
+        screen.blit(tooltip, tooltip_rect)
 
 class Ship(Unit):
     full_name = 'Corvette'
@@ -119,15 +151,8 @@ class Ship(Unit):
         if not self.selected:
             return
         x, y = self.grid_position
-        font = pygame.font.Font(None, 18)
-        lines = [
-            f"{self.full_name}",
-            f"Move: {self.move_range}",
-            f"Actions Left: {self.actions_left}",
-            f"Ability: {self.ability}"
-        ]
-        width = max(font.size(line)[0] for line in lines) + 12
-        height = len(lines) * 22 + 8
+        tooltip = self.cached_tooltip(self.tooltip_key(), self.tooltip_lines)
+        width, height = tooltip.get_size()
         tooltip_rect = pygame.Rect(
             x * GRID_SIZE + offset_x + GRID_SIZE + 6,
             y * GRID_SIZE + offset_y,
@@ -139,11 +164,7 @@ class Ship(Unit):
             tooltip_rect.x = max(0, WINDOW_WIDTH - tooltip_rect.width - 8)
         if tooltip_rect.bottom > WINDOW_HEIGHT:
             tooltip_rect.y = max(0, WINDOW_HEIGHT - tooltip_rect.height - 8)
-        pygame.draw.rect(screen, (30, 30, 30), tooltip_rect)
-        pygame.draw.rect(screen, WHITE, tooltip_rect, 1)
-        for i, line in enumerate(lines):
-            text = font.render(line, True, WHITE)
-            screen.blit(text, (tooltip_rect.x + 6, tooltip_rect.y + 4 + i * 22))
+        screen.blit(tooltip, tooltip_rect)
 
 class Frigate(Ship):
     full_name = 'Frigate'
@@ -253,21 +274,7 @@ class Carrier(Ship):
         # Find all open adjacent tiles
         x, y = self.grid_position
         adjacent = [(x+dx, y+dy) for dx,dy in [(-1,0),(1,0),(0,-1),(0,1)]]
-        open_tiles = []
-        for tx, ty in adjacent:
-            if 0 <= tx < GALAXY_SIZE and 0 <= ty < GALAXY_SIZE:
-                occupied = False
-                for ship in galaxy.ships:
-                    if ship.grid_position == (tx, ty):
-                        occupied = True
-                        break
-                for planet in galaxy.planets:
-                    px, py = planet.grid_position
-                    if px <= tx < px + planet.size and py <= ty < py + planet.size:
-                        occupied = True
-                        break
-                if not occupied:
-                    open_tiles.append((tx, ty))
+        open_tiles = [tile for tile in adjacent if galaxy.is_tile_open(tile)]
         deployed = 0
         for unit in list(self.docked_units):
             if not open_tiles:
@@ -275,7 +282,7 @@ class Carrier(Ship):
             pos = open_tiles.pop(0)
             unit.grid_position = pos
             unit.owner = self.owner
-            galaxy.ships.append(unit)
+            galaxy.add_ship(unit)
             self.docked_units.remove(unit)
             print(f"DEBUG: Deployed {unit.label} to {pos}")
             deployed += 1
@@ -1,15 +1,22 @@
+import argparse
 import pygame
 import sys
-from game.game_state import GameState
-from game.constants import WINDOW_WIDTH, WINDOW_HEIGHT, FPS, TITLE
+import time
+from game.loading import GameLoader, render_loading_screen
+from game.text_cache import text_cache
+from game.constants import WINDOW_WIDTH, WINDOW_HEIGHT, FPS, TITLE, GALAXY_SIZE, FIRST_FRAME_TARGET_MS
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, use_cache=True, size=GALAXY_SIZE, lazy=False):
+        self.start_time = time.perf_counter()
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption(TITLE)
         self.clock = pygame.time.Clock()
-        self.game_state = GameState()
+        # The galaxy is generated in the background while the loading screen runs
+        self.loader = GameLoader(seed=seed, use_cache=use_cache, size=size, lazy=lazy)
+        self.game_state = None
+        self.first_frame = True
         self.running = True
 
     def handle_events(self):
@@ -19,17 +26,32 @@ class Game:
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
-                elif event.key == pygame.K_SPACE:
+                elif event.key == pygame.K_SPACE and self.game_state:
                     self.game_state.end_turn()
-            self.game_state.handle_event(event)
+            if self.game_state:
+                self.game_state.handle_event(event)
 
     def update(self):
+        if self.game_state is None:
+            if self.loader.done:
+                self.game_state = self.loader.result()
+                print(f"Galaxy ready after {(self.loader.finished - self.start_time) * 1000:.0f} ms")
+            return
         self.game_state.update()
 
     def render(self):
         self.screen.fill((0, 0, 0))  # Black background
-        self.game_state.render(self.screen)
+        if self.game_state:
+            self.game_state.render(self.screen)
+        else:
+            render_loading_screen(self.screen, self.loader)
         pygame.display.flip()
+        if self.first_frame:
+            self.first_frame = False
+            elapsed = (time.perf_counter() - self.start_time) * 1000
+            print(f"First frame after {elapsed:.0f} ms")
+            if elapsed > FIRST_FRAME_TARGET_MS:
+                print(f"Warning: first frame took longer than the {FIRST_FRAME_TARGET_MS} ms target")
 
     def run(self):
         while self.running:
@@ -38,9 +60,23 @@ class Game:
             self.render()
             self.clock.tick(FPS)
 
+        print(text_cache.stats())
         pygame.quit()
         sys.exit()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument('--seed', type=int, default=None,
+                        help='world generation seed; the same seed always builds the same galaxy')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always regenerate the galaxy instead of loading a cached copy for --seed')
+    parser.add_argument('--size', type=int, default=GALAXY_SIZE,
+                        help='cells per side of the galaxy')
+    parser.add_argument('--lazy', action='store_true',
+                        help='generate the galaxy sector by sector as it comes into view (for very large maps)')
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    game = Game()
+    args = parse_args()
+    game = Game(seed=args.seed, use_cache=not args.no_cache, size=args.size, lazy=args.lazy)
     game.run() 
\ No newline at end of file
@@ -0,0 +1,73 @@
+import io
+import contextlib
+import numpy as np
+from game.constants import BUILDER_RANGE
+from game.galaxy import Galaxy
+from game.unit import BuilderShip, Cruiser
+
+
+def covered_by_scan(galaxy, owner, planet):
+    px, py = planet.grid_position
+    return planet.planet_type != 'SUN' and any(
+        ship.label == 'BLD' and ship.owner == owner
+        and abs(ship.grid_position[0] - px) + abs(ship.grid_position[1] - py) <= BUILDER_RANGE
+        for ship in galaxy.ships)
+
+
+def shuffle_ships(galaxy, rng, steps, span=None):
+    for _ in range(steps):
+        ship = galaxy.ships[int(rng.integers(len(galaxy.ships)))]
+        roll = rng.random()
+        if roll < 0.8:
+            dx, dy = map(int, rng.integers(-4, 5, 2))
+            pos = (ship.grid_position[0] + dx, ship.grid_position[1] + dy)
+            if galaxy.is_tile_open(pos):
+                galaxy.move_ship(ship, pos)
+        elif roll < 0.9:
+            galaxy.remove_ship(ship)
+            if galaxy.is_tile_open(ship.grid_position):
+                galaxy.add_ship(ship)
+        elif span:
+            # Lazy galaxies load and evict sectors, adding and removing planets under the builders
+            x, y = (int(v) for v in rng.integers(0, galaxy.size, 2))
+            galaxy.sectors.ensure_rect(x, y, x + span, y + span)
+            galaxy.sectors.trim()
+
+
+def add_ships(galaxy, rng, count, span):
+    for i in range(count):
+        x, y = (int(v) for v in rng.integers(0, span, 2))
+        galaxy.ensure_loaded((x, y))
+        if galaxy.planets and i % 2:
+            # Half of them start next to a planet so plenty of planets are covered
+            planet = galaxy.planets[int(rng.integers(len(galaxy.planets)))]
+            x = planet.grid_position[0] + int(rng.integers(-5, 6))
+            y = planet.grid_position[1] + int(rng.integers(-5, 6))
+        if galaxy.is_tile_open((x, y)):
+            galaxy.add_ship((BuilderShip if i % 2 else Cruiser)((x, y), owner=i // 2 % 2))
+
+
+def check(galaxy):
+    for planet in galaxy.planets:
+        for owner in (0, 1):
+            assert galaxy.coverage.covered(owner, planet) == covered_by_scan(galaxy, owner, planet)
+
+
+def test_coverage_matches_a_scan():
+    rng = np.random.default_rng(3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        galaxy = Galaxy(seed=7, use_cache=False, size=200)
+        galaxy.generate_planets(num_systems=8, min_distance=40)
+        add_ships(galaxy, rng, 200, galaxy.size)
+        shuffle_ships(galaxy, rng, 1500)
+    check(galaxy)
+
+
+def test_lazy_coverage_matches_a_scan():
+    rng = np.random.default_rng(4)
+    with contextlib.redirect_stdout(io.StringIO()):
+        galaxy = Galaxy(seed=7, size=1024, lazy=True)
+        galaxy.sectors.max_loaded = 6
+        add_ships(galaxy, rng, 200, 512)
+        shuffle_ships(galaxy, rng, 1500, span=300)
+    check(galaxy)
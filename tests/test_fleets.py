@@ -0,0 +1,43 @@
+import io
+import contextlib
+import numpy as np
+from game.galaxy import Galaxy
+from game.unit import Fighter, Carrier, BuilderShip, Cruiser
+
+
+def distance(ship, pos):
+    return abs(ship.grid_position[0] - pos[0]) + abs(ship.grid_position[1] - pos[1])
+
+
+def test_nearest_and_within_match_a_scan():
+    with contextlib.redirect_stdout(io.StringIO()):
+        galaxy = Galaxy(seed=5, use_cache=False, size=300)
+        galaxy.generate_asteroids(num_patches=0)
+        rng = np.random.default_rng(1)
+        kinds = [Fighter, Carrier, BuilderShip, Cruiser]
+        while len(galaxy.ships) < 600:
+            x, y = map(int, rng.integers(0, galaxy.size, 2))
+            if galaxy.is_tile_open((x, y)):
+                galaxy.add_ship(kinds[len(galaxy.ships) % 4]((x, y), owner=len(galaxy.ships) // 4 % 2))
+        for ship in galaxy.ships[:150]:
+            x, y = ship.grid_position
+            if galaxy.is_tile_open((x + 3, y)):
+                galaxy.move_ship(ship, (x + 3, y))
+        for ship in galaxy.ships[150:200]:
+            galaxy.remove_ship(ship)
+    divisible = lambda ship: ship.grid_position[0] % 3 == 0
+    for _ in range(200):
+        pos = tuple(int(v) for v in rng.integers(0, galaxy.size, 2))
+        for owner in (0, 1):
+            for where in (None, divisible):
+                candidates = [ship for ship in galaxy.ships if ship.label == 'CAR' and ship.owner == owner
+                              and (where is None or where(ship))]
+                nearest = galaxy.nearest(owner, 'CAR', pos, where)
+                if candidates:
+                    assert distance(nearest, pos) == min(distance(ship, pos) for ship in candidates)
+                else:
+                    assert nearest is None
+            for radius in (6, 40):
+                expected = [ship for ship in galaxy.ships if ship.label == 'BLD' and ship.owner == owner
+                            and distance(ship, pos) <= radius]
+                assert sorted(map(id, galaxy.within(owner, 'BLD', pos, radius))) == sorted(map(id, expected))
@@ -0,0 +1,60 @@
+import io
+import contextlib
+from game.constants import FLOW_FIELD_MARGIN
+from game.flow_field import FlowField
+from game.galaxy import Galaxy
+
+
+def make_galaxy(**kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Galaxy(seed=3, use_cache=False, **kwargs)
+
+
+def distance(pos, target):
+    return abs(pos[0] - target[0]) + abs(pos[1] - target[1])
+
+
+def group_order(galaxy, target):
+    ships = [ship for ship in galaxy.ships if ship.owner == 0]
+    galaxy.selected_ships = list(ships)
+    before = {ship: ship.grid_position for ship in ships}
+    with contextlib.redirect_stdout(io.StringIO()):
+        moved = galaxy.move_group(target)
+    return ships, before, moved
+
+
+def window_limit(ships):
+    # Cells per side the field may cover: the group, its reach each way and the blocked border
+    reach = max(ship.move_range for ship in ships) + FLOW_FIELD_MARGIN
+    span = max(max(ship.grid_position[i] for ship in ships) - min(ship.grid_position[i] for ship in ships) for i in (0, 1))
+    return span + 2 * reach + 1 + 2
+
+
+def test_far_target_field_covers_only_this_turn():
+    galaxy = make_galaxy()
+    ships = [ship for ship in galaxy.ships if ship.owner == 0]
+    field = FlowField(galaxy, (990, 990), ships)
+    assert max(field.dist.shape) <= window_limit(ships)
+    target = (990, 990)
+    ships, before, moved = group_order(galaxy, target)
+    assert moved == len(ships)
+    for ship in ships:
+        assert distance(ship.grid_position, target) < distance(before[ship], target)
+
+
+def test_far_target_leaves_distant_sectors_alone():
+    galaxy = make_galaxy(size=8192, lazy=True)
+    loaded = set(galaxy.sectors.loaded)
+    ships = [ship for ship in galaxy.ships if ship.owner == 0]
+    limit = window_limit(ships)
+    ships, before, moved = group_order(galaxy, (8000, 8000))
+    assert moved == len(ships)
+    # Nothing past the field's window gets generated for the order
+    allowed = {galaxy.sectors.key_of(x, y) for x in (0, limit) for y in (0, limit)}
+    assert set(galaxy.sectors.loaded) - loaded <= allowed
+
+
+def test_near_target_is_reached():
+    galaxy = make_galaxy()
+    ships, before, moved = group_order(galaxy, (4, 3))
+    assert any(ship.grid_position == (4, 3) for ship in ships)
@@ -0,0 +1,24 @@
+import io
+import contextlib
+from game.galaxy import Galaxy
+
+
+def test_raster_stays_bounded_after_sweep():
+    with contextlib.redirect_stdout(io.StringIO()):
+        galaxy = Galaxy(seed=2, size=4096, lazy=True)
+        sectors = galaxy.sectors
+        sectors.max_loaded = 4
+        view = 512
+        # Pan across the whole map zoomed out, the way Galaxy.render does
+        for y in range(0, galaxy.size, view):
+            for x in range(0, galaxy.size, view):
+                visible = sectors.ensure_rect(x, y, x + view, y + view)
+                sectors.trim(keep=visible)
+                galaxy.lod.refresh(x, y, x + view, y + view)
+    assert sectors.evicted > 0
+    cs = galaxy.lod.raster.chunk_size
+    # Raster pixels are only kept for sectors still in memory
+    for cx, cy in galaxy.lod.raster.chunks:
+        assert sectors.key_of(cx * cs, cy * cs) in sectors.loaded
+    for cx, cy in galaxy.lod.built:
+        assert sectors.key_of(cx * cs, cy * cs) in sectors.loaded
@@ -0,0 +1,22 @@
+import pygame
+from game.constants import BLACK, MOVE_TILE_COLOR
+from game.move_range import MoveTiles, MoveOverlay
+
+
+def test_overlay_not_shared_between_origins():
+    # Same cells reached from two different ships
+    cells = {(5, 5), (6, 5)}
+    near = MoveTiles((5, 6), 1, cells)
+    far = MoveTiles((6, 7), 2, cells)
+    assert near == far
+    overlay = MoveOverlay()
+    assert overlay.surface(near, 10) is not overlay.surface(far, 10)
+    for tiles in (near, far):
+        screen = pygame.Surface((100, 100))
+        screen.fill(BLACK)
+        overlay.render(screen, tiles, 10, 0, 0)
+        # Centre of each tile is filled and nothing lands on the ship's own cell
+        for x, y in cells:
+            assert screen.get_at((x * 10 + 5, y * 10 + 5))[:3] == MOVE_TILE_COLOR
+        ox, oy = tiles.origin
+        assert screen.get_at((ox * 10 + 5, oy * 10 + 5))[:3] == BLACK
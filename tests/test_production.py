@@ -0,0 +1,37 @@
+import io
+import contextlib
+import numpy as np
+from game.constants import BUILDING_PRODUCTION
+from game.galaxy import Galaxy
+
+
+def income_by_scan(galaxy, owner):
+    totals = {}
+    for planet in galaxy.planets:
+        if planet.owner == owner:
+            for resource, amount in planet.get_resource_production().items():
+                totals[resource] = totals.get(resource, 0) + amount
+    return {resource: amount for resource, amount in totals.items() if amount}
+
+
+def test_income_matches_per_planet_sum():
+    rng = np.random.default_rng(6)
+    buildings = list(BUILDING_PRODUCTION) + ['BUILDING']
+    with contextlib.redirect_stdout(io.StringIO()):
+        galaxy = Galaxy(seed=9, use_cache=False, size=300)
+        galaxy.generate_planets(num_systems=10, min_distance=40)
+        planets = [planet for planet in galaxy.planets if planet.planet_type != 'SUN']
+        for step in range(3000):
+            planet = planets[int(rng.integers(len(planets)))]
+            if rng.random() < 0.3:
+                galaxy.set_planet_owner(planet, [0, 1, 2, None][int(rng.integers(4))])
+            else:
+                x, y = (int(v) for v in rng.integers(0, planet.size, 2))
+                galaxy.place_building(planet, x, y, 0, buildings[int(rng.integers(len(buildings)))])
+            if step % 500 == 0:
+                # Planets coming and going, as when sectors are evicted and regenerated
+                gone = planets.pop(int(rng.integers(len(planets))))
+                galaxy.remove_planets([gone])
+    for owner in (0, 1, 2, 3):
+        assert galaxy.production.income(owner) == income_by_scan(galaxy, owner)
+        assert galaxy.production.planet_count(owner) == sum(planet.owner == owner for planet in galaxy.planets)
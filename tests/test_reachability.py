@@ -0,0 +1,70 @@
+import io
+import heapq
+import contextlib
+import numpy as np
+from game.galaxy import Galaxy
+from game.unit import Fighter, Bomber, Corvette, Carrier, Cruiser
+
+
+def make_galaxy(ships=200):
+    with contextlib.redirect_stdout(io.StringIO()):
+        galaxy = Galaxy(seed=5, use_cache=False, size=160)
+        galaxy.generate_planets(num_systems=8, min_distance=30)
+        galaxy.generate_asteroids(num_patches=12)
+        rng = np.random.default_rng(1)
+        kinds = [Fighter, Bomber, Corvette, Cruiser, Carrier]
+        while len(galaxy.ships) < ships:
+            x, y = map(int, rng.integers(0, galaxy.size, 2))
+            if galaxy.is_tile_open((x, y)):
+                galaxy.add_ship(kinds[len(galaxy.ships) % 5]((x, y), owner=len(galaxy.ships) % 2))
+    return galaxy, rng
+
+
+def dijkstra(galaxy, ship):
+    """Step costs to every cell ship can end its move on, the slow way"""
+    ox, oy = ship.grid_position
+    limit = ship.move_range
+    dist = {(ox, oy): 0}
+    queue = [(0, ox, oy)]
+    while queue:
+        d, x, y = heapq.heappop(queue)
+        if d > dist[(x, y)]:
+            continue
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if not (0 <= nx < galaxy.size and 0 <= ny < galaxy.size) or galaxy.planet_at((nx, ny)):
+                continue
+            other = galaxy.ship_at((nx, ny))
+            if other is not None:
+                # Fighters and bombers may end their move inside a friendly Carrier
+                if (ship.label in ('FIG', 'BOM') and other.label == 'CAR' and other.owner == ship.owner
+                        and other.can_dock(ship) and d + 1 <= limit):
+                    dist[(nx, ny)] = min(dist.get((nx, ny), d + 1), d + 1)
+                continue
+            cost = d + (2 if (nx, ny) in galaxy.asteroids else 1)
+            if cost <= limit and cost < dist.get((nx, ny), limit + 1):
+                dist[(nx, ny)] = cost
+                heapq.heappush(queue, (cost, nx, ny))
+    del dist[(ox, oy)]
+    return dist
+
+
+def test_reach_matches_dijkstra():
+    galaxy, rng = make_galaxy()
+    for _ in range(3):
+        for ship, reach in zip(galaxy.ships, galaxy.reach.many(galaxy.ships)):
+            expected = dijkstra(galaxy, ship)
+            assert reach.tiles_cost() == expected
+            assert reach.tiles == set(expected)
+            for pos in list(expected)[:3]:
+                path = reach.path_to(pos)
+                assert path[-1] == pos
+                prev = ship.grid_position
+                for cell in path:
+                    assert abs(cell[0] - prev[0]) + abs(cell[1] - prev[1]) == 1
+                    prev = cell
+        # Move some ships so cached results have to notice what changed around them
+        for ship in galaxy.ships[:40]:
+            x, y = ship.grid_position
+            pos = (x + int(rng.integers(-2, 3)), y + int(rng.integers(-2, 3)))
+            if galaxy.is_tile_open(pos):
+                galaxy.move_ship(ship, pos)
@@ -0,0 +1,61 @@
+import io
+import contextlib
+import numpy as np
+import game.galaxy
+import game.sectors
+from game.asteroids import PATCH_SHAPES, PATCH_OVERHANG, generate_patch, AsteroidField
+from game.constants import ASTEROID_PATCH_RADIUS, ASTEROID_PATCH_SIZE
+from game.galaxy import Galaxy
+
+
+def asteroid_cells(galaxy):
+    xs, ys = galaxy.asteroids.positions()
+    return set(zip(xs.tolist(), ys.tolist()))
+
+
+def test_patch_shapes_stay_within_overhang():
+    rng = np.random.default_rng(0)
+    radius = ASTEROID_PATCH_RADIUS[1]
+    reach = radius + PATCH_OVERHANG
+    for shape in PATCH_SHAPES:
+        for _ in range(50):
+            field = AsteroidField()
+            generate_patch(field, rng, (100, 100), shape, ASTEROID_PATCH_SIZE[1], radius, size=200)
+            xs, ys = field.positions()
+            assert np.abs(xs - 100).max() <= reach and np.abs(ys - 100).max() <= reach, shape
+
+
+def test_regenerated_sectors_reproduce_asteroids(monkeypatch):
+    # Push every patch to the far corner of its sector, spiral only, so any overhang would spill
+    monkeypatch.setattr(game.galaxy, 'PATCH_SHAPES', {'spiral': PATCH_SHAPES['spiral']})
+    monkeypatch.setattr(game.galaxy, 'pick_patch_centers',
+                        lambda rng, n, obstacles, bounds: [(bounds[2] - 1, bounds[3] - 1)] * n)
+    monkeypatch.setattr(game.galaxy, 'ASTEROID_PATCH_RADIUS', (ASTEROID_PATCH_RADIUS[1],) * 2)
+    monkeypatch.setattr(game.galaxy, 'ASTEROID_PATCH_SIZE', (ASTEROID_PATCH_SIZE[1],) * 2)
+    monkeypatch.setattr(game.sectors, 'SECTOR_ASTEROID_PATCHES', (20, 20))
+    with contextlib.redirect_stdout(io.StringIO()):
+        galaxy = Galaxy(seed=7, size=768, lazy=True)
+        keys = galaxy.sectors.ensure_rect(0, 0, galaxy.size, galaxy.size)
+        before = asteroid_cells(galaxy)
+        for key in keys:
+            if not galaxy.sectors.loaded[key].pinned:
+                galaxy.sectors.evict(key)
+                galaxy.sectors.ensure(key)
+    assert asteroid_cells(galaxy) == before
+
+
+def test_evicting_neighbours_keeps_spawn_planets():
+    # Spawn systems sit near the far corner, so their planets reach into the sectors around it
+    with contextlib.redirect_stdout(io.StringIO()):
+        galaxy = Galaxy(seed=4, size=828, lazy=True)
+        galaxy.sectors.ensure_rect(0, 0, galaxy.size, galaxy.size)
+        spawn_key = galaxy.sectors.key_of(*galaxy.spawn_points()[1])
+        spawn_bodies = list(galaxy.sectors.loaded[spawn_key].bodies)
+        sx, sy = spawn_key
+        for key in [(sx - 1, sy - 1), (sx - 1, sy), (sx, sy - 1)]:
+            galaxy.sectors.evict(key)
+            galaxy.sectors.ensure(key)
+    for body in spawn_bodies:
+        x, y = body.grid_position
+        for cell in [(x, y), (x + body.size - 1, y + body.size - 1)]:
+            assert galaxy.planet_at(cell) is body